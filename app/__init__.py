@@ -2,9 +2,15 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from app.config import config
+from app.database import SQLitePragmas
+from app.middleware import RequestMetrics
+from app.profiling import RequestProfiler
 
 db = SQLAlchemy()
-migrate = Migrate()
+migrate = Migrate(render_as_batch=True)
+sqlite_pragmas = SQLitePragmas()
+request_metrics = RequestMetrics()
+request_profiler = RequestProfiler()
 
 
 def create_app(config_name='default'):
@@ -15,6 +21,9 @@ def create_app(config_name='default'):
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
+    sqlite_pragmas.init_app(app, db)
+    request_metrics.init_app(app)
+    request_profiler.init_app(app)
 
     # Register blueprints
     from app.routes.main import main_bp
@@ -23,8 +32,24 @@ def create_app(config_name='default'):
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
 
-    # Create tables
-    with app.app_context():
-        db.create_all()
+    # Rendered page cache (app.caching also registers the data version listeners)
+    from app.caching import page_cache
+    page_cache.max_size = app.config['PAGE_CACHE_SIZE']
+
+    from app.events import broker
+    broker.queue_size = app.config['SSE_QUEUE_SIZE']
+
+    # CLI commands
+    from app.cli import register_cli
+    register_cli(app)
+
+    # Schema is managed by migrations (`flask db upgrade`); only throwaway
+    # databases (tests, in-memory) are created on the fly
+    if app.config.get('SCHEMA_AUTO_CREATE'):
+        from app.caching import seed_data_version
+
+        with app.app_context():
+            db.create_all()
+            seed_data_version()
 
     return app
@@ -0,0 +1,163 @@
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import current_app, make_response, request, session as flask_session, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db
+from app.models import DataVersion
+
+
+# --- Data version ------------------------------------------------------------
+# Any commit that wrote something other than the counter itself bumps it, so
+# (view, args, version) identifies a rendered page across all workers.
+
+@event.listens_for(Session, 'after_flush')
+def _mark_changed(session, flush_context):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, DataVersion):
+            session.info['data_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_changed(orm_execute_state):
+    # Query.update() / Query.delete() bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['data_changed'] = True
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_on_commit(session):
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    if not session.info.pop('data_changed', False):
+        return
+
+    # Core statements on the session connection: no ORM events, same transaction
+    connection = session.connection()
+    result = connection.execute(
+        update(DataVersion.__table__)
+        .where(DataVersion.__table__.c.id == 1)
+        .values(version=DataVersion.__table__.c.version + 1)
+    )
+    if result.rowcount == 0:
+        # Only for a database missing its seeded row (see seed_data_version)
+        connection.execute(insert(DataVersion.__table__).values(id=1, version=1))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    session.info.pop('data_changed', None)
+
+
+def mark_data_changed(session):
+    """Bump the data version on the next commit (for writes that bypass the ORM)"""
+    session.info['data_changed'] = True
+
+
+def seed_data_version():
+    """
+    Create the counter row (version 0) if it is missing. Migrations seed
+    it; this covers databases made by db.create_all(). Without it, two
+    first writers would both INSERT the row and one would lose its commit.
+    """
+    try:
+        with db.engine.begin() as connection:
+            if connection.execute(select(DataVersion.id).where(DataVersion.id == 1)).first() is None:
+                connection.execute(insert(DataVersion.__table__).values(id=1, version=0))
+    except IntegrityError:
+        pass  # Seeded by another process starting at the same time
+
+
+def current_data_version() -> int:
+    """Current data version (a single primary-key lookup)"""
+    version = db.session.execute(
+        select(DataVersion.version).where(DataVersion.id == 1)
+    ).scalar()
+    return version or 0
+
+
+# --- Rendered page cache -----------------------------------------------------
+
+class PageCache:
+    """Small thread-safe LRU of rendered responses, per process"""
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+page_cache = PageCache()
+
+
+def versioned_view(view=None, *, daily=False):
+    """
+    Strong ETag from (endpoint, URL args, query args, data version).
+
+    Conditional requests get 304 after only the version lookup. With
+    PAGE_CACHE_ENABLED, rendered pages are also reused until the data
+    version changes. Pages carrying flashed messages are never cached.
+
+    Use @versioned_view(daily=True) for pages that also depend on the
+    current date (periods ending today): the key then includes it.
+    """
+    if view is None:
+        return lambda view: versioned_view(view, daily=daily)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if '_flashes' in flask_session:
+            return view(*args, **kwargs)
+
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True))),
+            current_data_version(),
+            date.today().isoformat() if daily else None,
+        )
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            use_cache = current_app.config.get('PAGE_CACHE_ENABLED')
+            cached = page_cache.get(key) if use_cache else None
+            if cached is not None:
+                body, mimetype = cached
+                response = Response(body, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if use_cache and response.status_code == 200:
+                    page_cache.set(key, (response.get_data(), response.mimetype))
+
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    return wrapper
@@ -0,0 +1,290 @@
+import json
+import sys
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+
+profile_cli = AppGroup('profile', help='Profiling tools.')
+
+
+@profile_cli.command('fetch')
+@click.option('--source', 'sources', multiple=True, help='Source to fetch (repeatable). Default: all.')
+def profile_fetch(sources):
+    """Run JobAggregator.fetch_all under cProfile/tracemalloc (no DB writes)."""
+    from app.profiling import profile_run
+    from app.services.job_aggregator import get_aggregator
+
+    aggregator = get_aggregator(current_app._get_current_object())
+    with profile_run('fetch_all') as session:
+        results = aggregator.fetch_all(sources=list(sources) or None)
+
+    click.echo(json.dumps({
+        'profile': session.name,
+        'directory': session.directory,
+        'results': {k: {'status': v['status'], 'count': v['count']} for k, v in results.items()},
+    }, indent=2))
+
+
+@click.command('fetch')
+@click.option('--source', 'sources', multiple=True, help='Source to fetch (repeatable). Default: all enabled.')
+@click.option('--keyword', 'keywords', multiple=True, help='Search keyword (repeatable). Default: each source\'s own list.')
+@click.option('--country', help='Country code for sources that support it (adzuna).')
+@click.option('--departement', help='French departement for France Travail (e.g. 75).')
+@click.option('--workers', default=4, show_default=True, help='Sources fetched concurrently.')
+@click.option('--full', is_flag=True, help='Ignore the high-water marks and walk every page.')
+@click.option('--force', is_flag=True, help='Also fetch sources whose circuit breaker is open.')
+@click.option('--no-plan', is_flag=True, help='Send every query, ignoring the query planner.')
+@click.option('--dry-run', is_flag=True, help='Fetch only, do not write to the database.')
+@click.option('--quiet', is_flag=True, help='No progress output on stderr.')
+@with_appcontext
+def fetch_command(sources, keywords, country, departement, workers, full, force, no_plan, dry_run, quiet):
+    """
+    Fetch jobs from the configured sources and store the new ones.
+
+    Progress goes to stderr, a JSON summary to stdout. Exits with status 1
+    when a source fails; partial results (budget exhausted) and skipped
+    sources (unconfigured, circuit open) do not count as failures.
+    """
+    from app.services.ingest import load_watermarks, open_circuits, save_fetch_results
+    from app.services.job_aggregator import get_aggregator
+    from app.services.query_planner import plan_sources
+
+    aggregator = get_aggregator(current_app._get_current_object())
+    unknown = [name for name in sources if name not in aggregator.source_names]
+    if unknown:
+        raise click.BadParameter(
+            f"{', '.join(unknown)} (enabled: {', '.join(aggregator.source_names)})",
+            param_hint='--source'
+        )
+
+    params = {}
+    if keywords:
+        params['keywords'] = list(keywords)
+    if country:
+        params['country'] = country
+    if departement:
+        params['departement'] = departement
+
+    plans = {} if no_plan else plan_sources(aggregator, list(sources) or None)
+    # Queries given on the command line are sent as is
+    plans = {
+        name: plan for name, plan in plans.items()
+        if aggregator.get_fetcher(name).QUERY_PARAM not in params
+    }
+    total = len(sources or aggregator.source_names)
+    done = []
+
+    def progress(source_name, result):
+        done.append(source_name)
+        if quiet:
+            return
+        line = f"[{len(done)}/{total}] {source_name}: {result['status']}, {result['count']} jobs in {result['duration']:.1f}s"
+        if result.get('error'):
+            line += f" ({result['error']})"
+        click.echo(line, err=True)
+
+    started = time.perf_counter()
+    results = aggregator.fetch_all(
+        sources=list(sources) or None,
+        workers=workers,
+        on_result=progress,
+        since=None if full else load_watermarks(),
+        open_circuits=None if force else open_circuits(aggregator.source_names),
+        queries={name: plan.run for name, plan in plans.items()},
+        **params
+    )
+    fetch_duration = time.perf_counter() - started
+
+    new_counts = {}
+    if not dry_run:
+        new_counts = save_fetch_results(results)
+
+    failed = [name for name, result in results.items() if result['status'] == 'error']
+    partial = [name for name, result in results.items() if result['status'] == 'partial']
+    summary = {
+        'status': 'error' if failed else 'success',
+        'dry_run': dry_run,
+        'params': params,
+        'duration': round(time.perf_counter() - started, 2),
+        'fetch_duration': round(fetch_duration, 2),
+        'results': {
+            name: {
+                'status': result['status'],
+                'count': result['count'],
+                'new': new_counts.get(name, 0),
+                'duration': round(result['duration'], 2),
+                'error': result.get('error'),
+            }
+            for name, result in results.items()
+        },
+        'total_fetched': sum(result['count'] for result in results.values()),
+        'total_new_jobs': sum(new_counts.values()),
+        'failed': failed,
+        'partial': partial,
+        'plans': {name: plan.to_dict() for name, plan in plans.items()},
+    }
+    click.echo(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    if failed:
+        sys.exit(1)
+
+
+planner_cli = AppGroup('planner', help='Search query planner.')
+
+
+@planner_cli.command('report')
+@click.option('--source', 'sources', multiple=True, help='Source to report on (repeatable). Default: all planned.')
+def planner_report(sources):
+    """Per-query yield over recent runs and the plan for the next run."""
+    from app.services.job_aggregator import get_aggregator
+    from app.services.query_planner import plan_sources, query_history
+
+    aggregator = get_aggregator(current_app._get_current_object())
+    report = {}
+    for source_name, plan in plan_sources(aggregator, list(sources) or None).items():
+        history = query_history(source_name)
+        report[source_name] = {
+            'runs': len(history['runs']),
+            'queries': {
+                query: {
+                    'runs': entry['runs'],
+                    'calls': entry['calls'],
+                    'results': entry['results'],
+                    'new_ids': entry['new_ids'],
+                    'yield': round(entry['yield'], 2),
+                }
+                for query, entry in sorted(
+                    history['queries'].items(), key=lambda item: item[1]['yield'], reverse=True
+                )
+            },
+            'next_run': plan.to_dict(),
+        }
+
+    click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+salaries_cli = AppGroup('salaries', help='Salary normalization.')
+
+
+@salaries_cli.command('normalize')
+@click.option('--batch-size', default=500, show_default=True)
+def normalize_salaries(batch_size):
+    """(Re)compute salary period, currency and annual min/max for all jobs."""
+    from app import db
+    from app.models import Job
+
+    updated = 0
+    last_id = 0
+    while True:
+        jobs = Job.query.filter(Job.id > last_id).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+        for job in jobs:
+            job.normalize_salary()
+        db.session.commit()
+        updated += len(jobs)
+        last_id = jobs[-1].id
+
+    click.echo(f'{updated} jobs normalized')
+
+
+descriptions_cli = AppGroup('descriptions', help='Description storage.')
+
+
+@descriptions_cli.command('normalize')
+@click.option('--batch-size', default=500, show_default=True)
+def normalize_descriptions(batch_size):
+    """Recompute the plain-text analysis column of every description."""
+    from app import db
+    from app.models import JobDescription, decompress_text
+    from app.services.html_text import html_to_text
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = JobDescription.query.filter(JobDescription.job_id > last_id) \
+            .order_by(JobDescription.job_id).limit(batch_size).all()
+        if not rows:
+            break
+        for row in rows:
+            row.text = html_to_text(decompress_text(row.body))
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].job_id
+
+    click.echo(f'{updated} descriptions normalized')
+
+
+jobs_cli = AppGroup('jobs', help='Manual jobs import and URL fingerprints.')
+
+
+@jobs_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Input format (default: from the file extension).')
+@click.option('--encoding', default='utf-8-sig', show_default=True)
+@click.option('--batch-size', type=int, help='Jobs per commit (default: INGEST_BATCH_SIZE).')
+@click.option('--dry-run', is_flag=True, help='Validate and deduplicate without writing.')
+def import_jobs_command(path, fmt, encoding, batch_size, dry_run):
+    """Import manual jobs from a CSV or NDJSON file (optionally .gz)"""
+    from app.services.bulk_import import detect_format, import_jobs
+
+    detected, gzipped = detect_format(path)
+    fmt = fmt or detected
+    if fmt is None:
+        raise click.BadParameter('cannot tell the format from the extension, use --format', param_hint='PATH')
+
+    with open(path, 'rb') as stream:
+        report = import_jobs(stream, fmt, gzipped=gzipped, encoding=encoding,
+                             batch_size=batch_size, dry_run=dry_run)
+
+    click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+    if 'error' in report:
+        sys.exit(1)
+
+
+@jobs_cli.command('fingerprint')
+@click.option('--batch-size', default=500, show_default=True)
+def fingerprint_jobs(batch_size):
+    """Compute the URL fingerprint of jobs stored before it existed"""
+    from app import db
+    from app.models import Job
+    from app.services.urls import url_fingerprint
+
+    updated = 0
+    last_id = 0
+    while True:
+        jobs = Job.query.filter(Job.id > last_id).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+        for job in jobs:
+            job.url_fingerprint = url_fingerprint(job.url)
+        db.session.commit()
+        updated += len(jobs)
+        last_id = jobs[-1].id
+
+    click.echo(f'{updated} jobs fingerprinted')
+
+
+rollups_cli = AppGroup('rollups', help='Daily trend rollups.')
+
+
+@rollups_cli.command('rebuild')
+def rebuild_rollups_command():
+    """Recompute all daily rollups from the jobs table."""
+    from app.services.rollups import rebuild_rollups
+
+    click.echo(f'{rebuild_rollups()} jobs rolled up')
+
+
+def register_cli(app):
+    """Register the custom `flask` commands"""
+    app.cli.add_command(fetch_command)
+    app.cli.add_command(profile_cli)
+    app.cli.add_command(planner_cli)
+    app.cli.add_command(salaries_cli)
+    app.cli.add_command(descriptions_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(jobs_cli)
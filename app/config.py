@@ -4,16 +4,46 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def engine_options(database_uri: str) -> dict:
+    """Connection pool settings; SQLite keeps SQLAlchemy's defaults"""
+    if database_uri.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-prod')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///jobs.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # SQLite connection tuning (ignored on other backends). WAL lets readers
+    # work during a fetch; busy_timeout (ms) makes writers wait for the lock.
+    # Negative cache_size is in KiB.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -32000))
+
+    # Create tables at startup instead of running `flask db upgrade`
+    SCHEMA_AUTO_CREATE = os.environ.get('SCHEMA_AUTO_CREATE', 'false').lower() == 'true'
 
     # API Keys (optional)
     # France Travail (ex-Pôle Emploi) - https://francetravail.io
     FRANCETRAVAIL_CLIENT_ID = os.environ.get('FRANCETRAVAIL_CLIENT_ID')
     FRANCETRAVAIL_CLIENT_SECRET = os.environ.get('FRANCETRAVAIL_CLIENT_SECRET')
+    # OAuth tokens shared by all workers (file + lock); empty = per process only
+    OAUTH_TOKEN_CACHE = os.environ.get(
+        'OAUTH_TOKEN_CACHE', os.path.join(os.getcwd(), 'instance', 'oauth_tokens.json')
+    )
 
     # Careerjet - https://www.careerjet.com/partners/api/
     CAREERJET_AFFID = os.environ.get('CAREERJET_AFFID')
@@ -24,7 +54,50 @@ class Config:
 
     # Fetcher settings
     FETCH_TIMEOUT = int(os.environ.get('FETCH_TIMEOUT', 30))
-    MAX_JOBS_PER_SOURCE = int(os.environ.get('MAX_JOBS_PER_SOURCE', 100))
+    # Limits per run (seconds, 0 = none); a source over budget returns partial results
+    FETCH_DEADLINE = int(os.environ.get('FETCH_DEADLINE', 600))
+    FETCH_SOURCE_BUDGET = int(os.environ.get('FETCH_SOURCE_BUDGET', 180))
+    MAX_JOBS_PER_SOURCE = int(os.environ.get('MAX_JOBS_PER_SOURCE', 5000))
+    # Query planner: after MIN_RUNS runs, queries bringing fewer than MIN_YIELD
+    # new jobs per request only run once every PERIOD fetches
+    QUERY_PLANNER_ENABLED = os.environ.get('QUERY_PLANNER_ENABLED', 'true').lower() == 'true'
+    QUERY_PLANNER_MIN_RUNS = int(os.environ.get('QUERY_PLANNER_MIN_RUNS', 3))
+    QUERY_PLANNER_MIN_YIELD = float(os.environ.get('QUERY_PLANNER_MIN_YIELD', 0.2))
+    QUERY_PLANNER_PERIOD = int(os.environ.get('QUERY_PLANNER_PERIOD', 4))
+    # Skip a source after N consecutive failed fetches, for COOLDOWN seconds
+    CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_THRESHOLD', 3))
+    CIRCUIT_BREAKER_COOLDOWN = int(os.environ.get('CIRCUIT_BREAKER_COOLDOWN', 1800))
+
+    # Ingestion commits every INGEST_BATCH_SIZE new jobs to keep write locks short
+    INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 500))
+    # PostgreSQL: COPY into a staging table + INSERT ... ON CONFLICT instead of ORM inserts (opt-in)
+    POSTGRES_COPY_INGEST = os.environ.get('POSTGRES_COPY_INGEST', 'false').lower() == 'true'
+
+    # Market analysis: process pool used above ANALYZER_PARALLEL_MIN_JOBS jobs
+    ANALYZER_WORKERS = int(os.environ.get('ANALYZER_WORKERS', 1))
+    ANALYZER_PARALLEL_MIN_JOBS = int(os.environ.get('ANALYZER_PARALLEL_MIN_JOBS', 2000))
+
+    # Rendered page cache for dashboard / analytics / job detail, keyed on the data version
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'false').lower() == 'true'
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 128))
+
+    # Jobs per batch in the NDJSON / Parquet exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+    # Server-sent events (/api/events): each open dashboard holds a request worker,
+    # so only enable with threaded or gevent workers (gunicorn --worker-class gthread)
+    SSE_ENABLED = os.environ.get('SSE_ENABLED', 'false').lower() == 'true'
+    # Seconds between keepalives, events buffered per client
+    SSE_KEEPALIVE = int(os.environ.get('SSE_KEEPALIVE', 15))
+    SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 100))
+
+    # Request metrics (Server-Timing header + N+1 detection)
+    REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'false').lower() == 'true'
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+
+    # On-demand profiling (X-Profile header or `flask profile fetch`)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.getcwd(), 'profiles'))
 
 
 class DevelopmentConfig(Config):
@@ -38,6 +111,9 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SCHEMA_AUTO_CREATE = True
+    OAUTH_TOKEN_CACHE = None
 
 
 config = {
@@ -0,0 +1,49 @@
+from typing import Dict
+from sqlalchemy import event
+
+
+def sqlite_pragmas(config) -> Dict[str, object]:
+    """PRAGMAs applied to every new SQLite connection, from the app config"""
+    pragmas = {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS'),
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT'),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE'),
+        'cache_size': config.get('SQLITE_CACHE_SIZE'),
+    }
+    return {name: value for name, value in pragmas.items() if value not in (None, '')}
+
+
+class SQLitePragmas:
+    """
+    Connection tuning for the SQLite backend.
+
+    WAL lets dashboard readers run while a fetch is writing, busy_timeout
+    makes concurrent writers (several gunicorn workers) wait instead of
+    failing with 'database is locked'. Does nothing on other backends.
+    """
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            return
+
+        pragmas = sqlite_pragmas(app.config)
+        if not pragmas:
+            return
+
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f'PRAGMA {name}={value}')
+            finally:
+                cursor.close()
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'connect', set_pragmas)
+        app.extensions['sqlite_pragmas'] = pragmas
@@ -0,0 +1,96 @@
+import itertools
+import json
+import queue
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional, Set, Tuple
+
+
+class Subscriber:
+    """One open event stream: a bounded queue of (id, event, data)"""
+
+    def __init__(self, max_size: int):
+        self.queue: queue.Queue = queue.Queue(max_size)
+        self.closed = False
+
+
+class EventBroker:
+    """
+    In-process pub/sub behind the server-sent events stream (/api/events).
+
+    Publishers never block: a subscriber whose queue is full (a stalled
+    client) is dropped, and its EventSource reconnects with Last-Event-ID.
+    The last `history` events are kept so that a reconnecting client gets
+    what it missed. Events only reach streams served by the same process.
+    """
+
+    def __init__(self, queue_size: int = 100, history: int = 50):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscriber] = set()
+        self._history: Deque[Tuple[int, str, Dict]] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: Dict) -> int:
+        """Send an event to every open stream, returns its id"""
+        with self._lock:
+            message = (next(self._ids), event, data)
+            self._history.append(message)
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.queue.put_nowait(message)
+                except queue.Full:
+                    subscriber.closed = True
+                    self._subscribers.discard(subscriber)
+        return message[0]
+
+    def subscribe(self, last_event_id: int = None) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                missed = [message for message in self._history if message[0] > last_event_id]
+                for message in missed[-self.queue_size:]:
+                    subscriber.queue.put_nowait(message)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def stream(self, last_event_id: int = None, keepalive: float = 15) -> Iterator[str]:
+        """
+        text/event-stream body. A comment line is sent every `keepalive`
+        seconds without events, which keeps proxies from closing the
+        connection and lets the server notice clients that went away.
+        """
+        subscriber = self.subscribe(last_event_id)
+        try:
+            # Reconnect delay for EventSource, in milliseconds
+            yield 'retry: 3000\n\n'
+            while not subscriber.closed:
+                try:
+                    event_id, event, data = subscriber.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_event(event_id, event, data)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def format_event(event_id: Optional[int], event: str, data: Dict) -> str:
+    """One server-sent event (data is JSON, on a single line)"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+broker = EventBroker()
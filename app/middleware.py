@@ -0,0 +1,106 @@
+import re
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Literals and expanded IN lists are folded so that the same query issued
+# with different parameters maps to a single statement shape.
+_WHITESPACE_RE = re.compile(r'\s+')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement to its shape (literals replaced by ?)"""
+    shape = _STRING_RE.sub('?', statement)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('(?)', shape)
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_metrics' in g:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and 'sql_metrics' in g):
+        return
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    metrics = g.sql_metrics
+    metrics['count'] += 1
+    metrics['duration'] += elapsed
+    metrics['shapes'][statement_shape(statement)] += 1
+
+
+class RequestMetrics:
+    """
+    Opt-in per-request timing and SQL query counting.
+
+    Records handler time, number of SQL statements and total SQL time,
+    reports them in a Server-Timing header and in the app log, and warns
+    when the same statement shape is repeated (possible N+1).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('REQUEST_METRICS_ENABLED'):
+            return
+
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions['request_metrics'] = self
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+        g.sql_metrics = {'count': 0, 'duration': 0.0, 'shapes': Counter()}
+
+    def _finish(self, response):
+        if 'sql_metrics' not in g:
+            return response
+
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        metrics = g.sql_metrics
+        sql_ms = metrics['duration'] * 1000
+        threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+
+        suspects = [
+            (shape, count) for shape, count in metrics['shapes'].most_common()
+            if count >= threshold
+        ]
+
+        timings = [
+            f'app;dur={total_ms:.1f}',
+            f'db;dur={sql_ms:.1f};desc="{metrics["count"]} queries"',
+        ]
+        if suspects:
+            timings.append(f'nplus1;desc="{len(suspects)} repeated statements"')
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+        current_app.logger.info(
+            '%s %s -> %s in %.1fms (%d queries, %.1fms SQL)',
+            request.method, request.path, response.status_code,
+            total_ms, metrics['count'], sql_ms
+        )
+        for shape, count in suspects:
+            current_app.logger.warning(
+                'Possible N+1 on %s %s: %d x %s',
+                request.method, request.path, count, shape[:300]
+            )
+
+        return response
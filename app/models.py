@@ -1,7 +1,17 @@
+import zlib
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
 
 
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode('utf-8')
+
+
 # Association table for job-tag many-to-many
 job_tags = db.Table(
     'job_tags',
@@ -19,7 +29,7 @@ class Job(db.Model):
     external_id = db.Column(db.String(255), nullable=True)
     title = db.Column(db.String(500), nullable=False)
     company = db.Column(db.String(255), nullable=False)
-    description = db.Column(db.Text, nullable=True)
+    # description: zlib-compressed in job_descriptions, see the property below
 
     # Location & type
     location = db.Column(db.String(255), nullable=True)
@@ -31,8 +41,16 @@ class Job(db.Model):
     salary_currency = db.Column(db.String(10), nullable=True)
     salary_text = db.Column(db.String(255), nullable=True)
 
+    # Compensation normalized at ingestion (see Job.normalize_salary); the
+    # raw fields above are never rewritten
+    salary_period = db.Column(db.String(10), nullable=True)  # hourly / daily / monthly / yearly
+    salary_annual_currency = db.Column(db.String(10), nullable=True)  # detected, see detect_currency
+    salary_annual_min = db.Column(db.Integer, nullable=True, index=True)
+    salary_annual_max = db.Column(db.Integer, nullable=True, index=True)
+
     # URLs
     url = db.Column(db.String(1000), nullable=True)
+    url_fingerprint = db.Column(db.String(40), nullable=True, index=True)  # set with url, see urls.url_fingerprint
     company_logo = db.Column(db.String(1000), nullable=True)
 
     # Source tracking
@@ -53,38 +71,101 @@ class Job(db.Model):
 
     # Relationships
     tags = db.relationship('Tag', secondary=job_tags, backref=db.backref('jobs', lazy='dynamic'))
+    description_row = db.relationship(
+        'JobDescription', uselist=False, lazy='select', cascade='all, delete-orphan'
+    )
 
     # Unique constraint
     __table_args__ = (
         db.UniqueConstraint('source', 'external_id', name='uq_source_external_id'),
     )
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'external_id': self.external_id,
-            'title': self.title,
-            'company': self.company,
-            'description': self.description,
-            'location': self.location,
-            'job_type': self.job_type,
-            'salary_min': self.salary_min,
-            'salary_max': self.salary_max,
-            'salary_currency': self.salary_currency,
-            'salary_text': self.salary_text,
-            'url': self.url,
-            'company_logo': self.company_logo,
-            'source': self.source,
-            'source_category': self.source_category,
-            'is_manual': self.is_manual,
-            'is_bookmarked': self.is_bookmarked,
-            'is_applied': self.is_applied,
-            'notes': self.notes,
-            'posted_at': self.posted_at.isoformat() if self.posted_at else None,
-            'fetched_at': self.fetched_at.isoformat() if self.fetched_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'tags': [tag.name for tag in self.tags]
-        }
+    @property
+    def description(self):
+        """Raw description, loaded and decompressed on first access only"""
+        if self.description_row is None:
+            return None
+        return decompress_text(self.description_row.body)
+
+    @description.setter
+    def description(self, value):
+        from app.services.html_text import html_to_text
+
+        if not value:
+            self.description_row = None
+            return
+
+        if self.description_row is None:
+            self.description_row = JobDescription()
+        self.description_row.body = compress_text(value)
+        self.description_row.text = html_to_text(value)
+
+    @property
+    def description_text(self):
+        """Plain-text, lowercased description used by analysis and search"""
+        if self.description_row is None:
+            return None
+        return self.description_row.text
+
+    @validates('url')
+    def _set_url_fingerprint(self, key, value):
+        from app.services.urls import url_fingerprint
+
+        self.url_fingerprint = url_fingerprint(value)
+        return value
+
+    @classmethod
+    def description_contains(cls, search: str):
+        """Filter clause matching `search` in the plain-text description"""
+        return cls.description_row.has(JobDescription.text.like(f'%{search.lower()}%'))
+
+    def normalize_salary(self):
+        """(Re)compute salary period, currency and annual min/max from the raw salary fields"""
+        from app.services.market_analyzer import normalize_salary
+
+        normalized = normalize_salary(
+            self.salary_text, self.salary_min, self.salary_max,
+            self.salary_currency, self.source
+        )
+        if normalized:
+            (self.salary_period, self.salary_annual_currency,
+             self.salary_annual_min, self.salary_annual_max) = normalized
+        else:
+            self.salary_period = self.salary_annual_currency = None
+            self.salary_annual_min = self.salary_annual_max = None
+
+    # Keys of to_dict(), in output order
+    SERIALIZABLE_FIELDS = (
+        'id', 'external_id', 'title', 'company', 'description', 'location', 'job_type',
+        'salary_min', 'salary_max', 'salary_currency', 'salary_text',
+        'salary_period', 'salary_annual_currency', 'salary_annual_min', 'salary_annual_max',
+        'url', 'company_logo', 'source', 'source_category',
+        'is_manual', 'is_bookmarked', 'is_applied', 'notes',
+        'posted_at', 'fetched_at', 'created_at', 'tags',
+    )
+    _DATETIME_FIELDS = ('posted_at', 'fetched_at', 'created_at')
+
+    def to_dict(self, fields=None):
+        """Serialize the job; `fields` restricts the output (and what gets loaded)"""
+        data = {}
+        for field in fields or self.SERIALIZABLE_FIELDS:
+            if field == 'tags':
+                value = [tag.name for tag in self.tags]
+            else:
+                value = getattr(self, field)
+                if field in self._DATETIME_FIELDS and value:
+                    value = value.isoformat()
+            data[field] = value
+        return data
+
+
+class JobDescription(db.Model):
+    """Compressed job description, kept out of the jobs table so list queries stay small"""
+    __tablename__ = 'job_descriptions'
+
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    body = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed UTF-8
+    text = db.Column(db.Text, nullable=True)  # HTML stripped, lowercased (see html_to_text)
 
 
 class Tag(db.Model):
@@ -109,3 +190,135 @@ class FetchLog(db.Model):
 
     def __repr__(self):
         return f'<FetchLog {self.source} - {self.status}>'
+
+
+class FetchWatermark(db.Model):
+    """
+    Newest posted_at fully fetched per source, search scope ('' = default
+    country, location... see BaseFetcher.watermark_scope) and search
+    keyword ('' = no keyword)
+    """
+    __tablename__ = 'fetch_watermarks'
+
+    source = db.Column(db.String(50), primary_key=True)
+    scope = db.Column(db.String(255), primary_key=True, default='')
+    keyword = db.Column(db.String(255), primary_key=True, default='')
+    posted_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FetchWatermark {self.source}/{self.scope}/{self.keyword} {self.posted_at}>'
+
+
+class QueryStat(db.Model):
+    """Requests and results of one search query in one fetch run (see query_planner)"""
+    __tablename__ = 'query_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(50), nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    results = db.Column(db.Integer, nullable=False, default=0)
+    # Ids no query before it in the same run had returned
+    new_ids = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_query_stats_source_run_at', 'source', 'run_at'),
+    )
+
+    def __repr__(self):
+        return f'<QueryStat {self.source}/{self.keyword} {self.new_ids}/{self.results}>'
+
+
+class TechDailyRollup(db.Model):
+    """Number of jobs mentioning a technology, per posted_at day"""
+    __tablename__ = 'rollup_tech_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    technology = db.Column(db.String(100), primary_key=True)
+    mentions = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SalaryDailyRollup(db.Model):
+    """Annualized salary summary per posted_at day and currency"""
+    __tablename__ = 'rollup_salary_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    currency = db.Column(db.String(10), primary_key=True)
+    jobs_with_salary = db.Column(db.Integer, nullable=False, default=0)
+    annual_sum = db.Column(db.Float, nullable=False, default=0.0)
+    annual_min = db.Column(db.Integer, nullable=True)
+    annual_max = db.Column(db.Integer, nullable=True)
+
+
+class JobDailyRollup(db.Model):
+    """Number of jobs per posted_at day, source and job_type"""
+    __tablename__ = 'rollup_jobs_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    source = db.Column(db.String(50), primary_key=True)
+    job_type = db.Column(db.String(50), primary_key=True)
+    jobs = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DataVersion(db.Model):
+    """Single-row counter bumped on every committed write (see app.caching)"""
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SavedSearch(db.Model):
+    """Dashboard filters to watch: new jobs matching them are recorded at ingestion"""
+    __tablename__ = 'saved_searches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    # Every word must appear in the title, company or description
+    keywords = db.Column(db.String(500), nullable=False, default='')
+    source = db.Column(db.String(50), nullable=True)
+    job_type = db.Column(db.String(50), nullable=True)
+    tag = db.Column(db.String(100), nullable=True)
+    min_daily = db.Column(db.Integer, nullable=True)
+    min_annual = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    matches = db.relationship('SavedSearchMatch', backref='saved_search', lazy='dynamic', cascade='all, delete-orphan')
+
+    def to_filters(self):
+        """The search as dashboard filter args"""
+        args = {
+            'search': self.keywords,
+            'source': self.source,
+            'job_type': self.job_type,
+            'tag': self.tag,
+            'min_daily': self.min_daily,
+            'min_annual': self.min_annual,
+        }
+        return {key: value for key, value in args.items() if value}
+
+    def __repr__(self):
+        return f'<SavedSearch {self.name}>'
+
+
+class SavedSearchMatch(db.Model):
+    """A job that matched a saved search when it was ingested"""
+    __tablename__ = 'saved_search_matches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_searches.id', ondelete='CASCADE'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    matched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    seen = db.Column(db.Boolean, default=False, nullable=False)
+
+    job = db.relationship('Job')
+
+    __table_args__ = (
+        db.UniqueConstraint('saved_search_id', 'job_id', name='uq_saved_search_job'),
+        db.Index('ix_saved_search_matches_seen_matched_at', 'seen', 'matched_at'),
+    )
+
+    def __repr__(self):
+        return f'<SavedSearchMatch {self.saved_search_id}/{self.job_id}>'
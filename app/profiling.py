@@ -0,0 +1,135 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+from flask import current_app, g, request
+
+
+PROFILE_HEADER = 'X-Profile'
+_LABEL_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+class ProfileSession:
+    """cProfile + tracemalloc around a single unit of work"""
+
+    def __init__(self, label: str, directory: str, top: int = 40):
+        self.label = _LABEL_RE.sub('_', label).strip('_') or 'run'
+        self.directory = directory
+        self.top = top
+        self._profile = cProfile.Profile()
+        self._owns_tracemalloc = False
+        self.name = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._owns_tracemalloc = True
+        self._profile.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and write the reports. Returns the report base name."""
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{self.label}"
+        base = os.path.join(self.directory, name)
+
+        self._profile.dump_stats(base + '.pstats')
+
+        out = io.StringIO()
+        out.write(f'# Profile: {self.label}\n\n## cProfile (cumulative)\n\n')
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats('cumulative').print_stats(self.top)
+
+        out.write(f'\n## tracemalloc (top {self.top} by line)\n\n')
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            out.write(f'{stat}\n')
+
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
+
+        self.name = name
+        return name
+
+
+@contextmanager
+def profile_run(label: str, directory: str = None):
+    """Profile the enclosed block and save the reports to `directory`"""
+    if directory is None:
+        directory = current_app.config['PROFILE_DIR']
+    session = ProfileSession(label, directory)
+    session.start()
+    try:
+        yield session
+    finally:
+        session.stop()
+
+
+def list_profiles(directory: str, limit: int = 50) -> List[Dict]:
+    """Recent profile reports, newest first"""
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.txt'):
+            continue
+        path = os.path.join(directory, filename)
+        name = filename[:-len('.txt')]
+        profiles.append({
+            'name': name,
+            'created_at': datetime.fromtimestamp(os.path.getmtime(path)),
+            'size': os.path.getsize(path),
+            'has_pstats': os.path.exists(os.path.join(directory, name + '.pstats')),
+        })
+
+    profiles.sort(key=lambda p: p['created_at'], reverse=True)
+    return profiles[:limit]
+
+
+class RequestProfiler:
+    """
+    Profile single requests on demand.
+
+    When PROFILING_ENABLED is set, a request carrying the X-Profile header
+    runs under cProfile and tracemalloc and its reports go to PROFILE_DIR.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILING_ENABLED'):
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions['request_profiler'] = self
+
+    def _start(self):
+        if not request.headers.get(PROFILE_HEADER):
+            return
+        if request.endpoint and request.endpoint.startswith('main.profile'):
+            return
+
+        session = ProfileSession(
+            f'{request.method}-{request.path}',
+            current_app.config['PROFILE_DIR']
+        )
+        session.start()
+        g.profile_session = session
+
+    def _finish(self, response):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            response.headers['X-Profile-Report'] = session.stop()
+        return response
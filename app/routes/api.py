@@ -1,71 +1,75 @@
+import base64
 import csv
+import hashlib
 import io
+import json
+import tempfile
+import uuid
 from datetime import datetime
-from flask import Blueprint, jsonify, request, Response, current_app
+from flask import Blueprint, jsonify, request, Response, current_app, send_file, stream_with_context
+from sqlalchemy.orm import load_only, selectinload
 from app import db
+from app.caching import current_data_version
 from app.models import Job, FetchLog
+from app.routes.filters import parse_job_filters, apply_job_filters
 
 api_bp = Blueprint('api', __name__)
 
 
 @api_bp.route('/fetch', methods=['POST'])
 def fetch_jobs():
-    """Trigger job fetch from all or specific sources"""
-    from app.services.job_aggregator import JobAggregator
+    """
+    Trigger job fetch from all or specific sources.
+
+    Progress is published on /api/events while the sources answer
+    (fetch_started, fetch_progress, fetch_finished), followed by a `jobs`
+    event with the new job counts.
+    """
+    from app.events import broker
+    from app.services.ingest import load_watermarks, open_circuits, save_fetch_results
+    from app.services.job_aggregator import get_aggregator
+    from app.services.query_planner import plan_sources
 
     sources = None
+    full = False
     try:
         if request.is_json and request.json:
             sources = request.json.get('sources')
+            full = bool(request.json.get('full'))
     except Exception:
         pass  # No JSON body, fetch all sources
 
-    aggregator = JobAggregator(current_app.config)
-    results = aggregator.fetch_all(sources=sources)
-
-    total_fetched = 0
-    for source_name, result in results.items():
-        # Log the fetch
-        log = FetchLog(
-            source=source_name,
-            status=result['status'],
-            jobs_fetched=result['count'],
-            error_message=result.get('error')
-        )
-        db.session.add(log)
-
-        # Save jobs to database
-        if result['status'] == 'success':
-            for job_data in result['jobs']:
-                # Check if job already exists
-                existing = Job.query.filter_by(
-                    source=source_name,
-                    external_id=job_data.external_id
-                ).first()
-
-                if not existing:
-                    job = Job(
-                        external_id=job_data.external_id,
-                        title=job_data.title,
-                        company=job_data.company,
-                        description=job_data.description,
-                        location=job_data.location,
-                        job_type=job_data.job_type,
-                        salary_min=job_data.salary_min,
-                        salary_max=job_data.salary_max,
-                        salary_currency=job_data.salary_currency,
-                        salary_text=job_data.salary_text,
-                        url=job_data.url,
-                        company_logo=job_data.company_logo,
-                        source=source_name,
-                        source_category=job_data.source_category,
-                        posted_at=job_data.posted_at,
-                        fetched_at=datetime.utcnow()
-                    )
-                    db.session.add(job)
-                    total_fetched += 1
-
-    db.session.commit()
+    aggregator = get_aggregator(current_app._get_current_object())
+    names = [name for name in aggregator.source_names if not sources or name in sources]
+    run_id = uuid.uuid4().hex[:8]
+    broker.publish('fetch_started', {'run': run_id, 'sources': names})
+    done = []
+
+    def progress(source_name, result):
+        done.append(source_name)
+        broker.publish('fetch_progress', {
+            'run': run_id,
+            'source': source_name,
+            'status': result['status'],
+            'count': result['count'],
+            'error': result.get('error'),
+            'done': len(done),
+            'total': len(names),
+        })
+
+    results = aggregator.fetch_all(
+        sources=sources,
+        on_result=progress,
+        since=None if full else load_watermarks(),
+        open_circuits=open_circuits(aggregator.source_names),
+        queries={name: plan.run for name, plan in plan_sources(aggregator, sources).items()}
+    )
+    new_counts = save_fetch_results(results)
+    total_fetched = sum(new_counts.values())
+
+    broker.publish('fetch_finished', {'run': run_id, 'new_jobs': new_counts, 'total_new_jobs': total_fetched})
+    if total_fetched:
+        broker.publish('jobs', {'new_jobs': new_counts, 'total_new_jobs': total_fetched})
 
     return jsonify({
         'status': 'success',
@@ -74,6 +78,156 @@ def fetch_jobs():
     })
 
 
+def events():
+    """
+    Server-sent events: fetch progress and new job notifications.
+
+    One long-lived response per client, fed from the in-process broker
+    (no database query). Honors Last-Event-ID on reconnection. Only
+    routed when SSE_ENABLED is set, see register_events.
+    """
+    from app.events import broker
+
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    return Response(
+        broker.stream(last_event_id, keepalive=current_app.config['SSE_KEEPALIVE']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@api_bp.record_once
+def register_events(state):
+    """
+    Route /api/events only with SSE_ENABLED: each client holds a request
+    worker for as long as its page is open, which sync workers cannot afford.
+    """
+    if state.app.config.get('SSE_ENABLED'):
+        state.add_url_rule('/events', view_func=events)
+
+
+@api_bp.route('/jobs')
+def list_jobs():
+    """
+    Jobs as JSON, with the dashboard filters.
+
+    Query args (besides the filters):
+        fields: comma-separated subset of Job.to_dict() keys (default: all)
+        limit: page size (default 50, max 500)
+        cursor: opaque `next_cursor` from the previous page
+
+    Newest jobs first (by id). Supports ETag / If-None-Match (data version).
+    """
+    filters = parse_job_filters(request.args)
+
+    fields = request.args.get('fields')
+    if fields:
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+        unknown = set(fields) - set(Job.SERIALIZABLE_FIELDS)
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+    else:
+        fields = list(Job.SERIALIZABLE_FIELDS)
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+
+    cursor = request.args.get('cursor')
+    after_id = None
+    if cursor:
+        try:
+            after_id = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))['id'])
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    query = apply_job_filters(Job.query, filters)
+    if after_id is not None:
+        query = query.filter(Job.id < after_id)
+
+    # Answer conditional requests from the data version alone, before
+    # touching the jobs table
+    etag = hashlib.sha1(json.dumps(
+        [sorted(request.args.items(multi=True)), current_data_version()]
+    ).encode()).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    columns = [getattr(Job, f) for f in fields if f not in ('id', 'description', 'tags')]
+    options = [load_only(Job.id, *columns)]
+    if 'tags' in fields:
+        options.append(selectinload(Job.tags))
+    if 'description' in fields:
+        options.append(selectinload(Job.description_row))
+
+    jobs = query.options(*options).order_by(Job.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = base64.urlsafe_b64encode(json.dumps({'id': jobs[-1].id}).encode()).decode()
+
+    response = jsonify({
+        'jobs': [job.to_dict(fields) for job in jobs],
+        'count': len(jobs),
+        'next_cursor': next_cursor
+    })
+    response.set_etag(etag)
+    return response
+
+
+@api_bp.route('/jobs/facets')
+def job_facets():
+    """Counts per source, job type, bookmarked/applied and tag for the dashboard filters"""
+    from app.services.facets import facet_counts
+
+    return jsonify(facet_counts(parse_job_filters(request.args)))
+
+
+@api_bp.route('/jobs/import', methods=['POST'])
+def import_jobs():
+    """
+    Bulk import of manual jobs from a CSV or NDJSON upload.
+
+    The file comes as the `file` field of a multipart form, or as the raw
+    request body. The format is taken from `format` (csv / ndjson), else
+    from the file name or Content-Type; `gzip=true` or a .gz name for
+    compressed files, `dry_run=true` to only validate. Returns the
+    per-row report of bulk_import.import_jobs.
+    """
+    from app.events import broker
+    from app.services.bulk_import import IMPORT_FORMATS, detect_format, import_jobs as run_import
+
+    upload = request.files.get('file')
+    if upload is not None:
+        fmt, gzipped = detect_format(upload.filename)
+        stream = upload.stream
+    else:
+        fmt, gzipped = None, False
+        if request.mimetype == 'text/csv':
+            fmt = 'csv'
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            fmt = 'ndjson'
+        stream = request.stream
+
+    fmt = request.args.get('format') or fmt
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': 'Unknown format: pass format=csv or format=ndjson'}), 400
+
+    report = run_import(
+        stream,
+        fmt,
+        gzipped=gzipped or request.args.get('gzip') == 'true',
+        encoding=request.args.get('encoding', 'utf-8-sig'),
+        dry_run=request.args.get('dry_run') == 'true'
+    )
+    if report['imported'] and not report['dry_run']:
+        broker.publish('jobs', {'new_jobs': {'manual': report['imported']}, 'total_new_jobs': report['imported']})
+
+    return jsonify(report), 400 if 'error' in report else 200
+
+
 @api_bp.route('/fetch/status')
 def fetch_status():
     """Get last fetch status per source"""
@@ -107,29 +261,7 @@ def fetch_status():
 @api_bp.route('/export/csv')
 def export_csv():
     """Export filtered jobs to CSV"""
-    # Get filter parameters (same as dashboard)
-    source = request.args.get('source')
-    job_type = request.args.get('job_type')
-    search = request.args.get('search')
-    bookmarked_only = request.args.get('bookmarked') == 'true'
-
-    # Build query
-    query = Job.query
-
-    if source:
-        query = query.filter(Job.source == source)
-    if job_type:
-        query = query.filter(Job.job_type == job_type)
-    if search:
-        query = query.filter(
-            db.or_(
-                Job.title.ilike(f'%{search}%'),
-                Job.company.ilike(f'%{search}%'),
-                Job.description.ilike(f'%{search}%')
-            )
-        )
-    if bookmarked_only:
-        query = query.filter(Job.is_bookmarked == True)
+    query = apply_job_filters(Job.query, parse_job_filters(request.args))
 
     jobs = query.order_by(Job.posted_at.desc().nullslast()).all()
 
@@ -168,13 +300,56 @@ def export_csv():
     )
 
 
+@api_bp.route('/export/ndjson')
+def export_ndjson():
+    """
+    Export filtered jobs as newline-delimited JSON, every column included.
+
+    Streamed in batches of EXPORT_BATCH_SIZE jobs; `gzip=true` compresses
+    the stream (.ndjson.gz).
+    """
+    from app.services.export import ndjson_chunks
+
+    query = apply_job_filters(Job.query, parse_job_filters(request.args))
+    compress = request.args.get('gzip') == 'true'
+    filename = f'jobs_export_{datetime.now().strftime("%Y%m%d")}.ndjson' + ('.gz' if compress else '')
+
+    return Response(
+        stream_with_context(ndjson_chunks(query, current_app.config['EXPORT_BATCH_SIZE'], compress)),
+        mimetype='application/gzip' if compress else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@api_bp.route('/export/parquet')
+def export_parquet():
+    """Export filtered jobs as typed Parquet (one row group per batch); requires pyarrow"""
+    from app.services.export import parquet_available, write_parquet
+
+    if not parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow (pip install pyarrow)'}), 501
+
+    query = apply_job_filters(Job.query, parse_job_filters(request.args))
+
+    # The Parquet footer is written last: build the file, then send it
+    output = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+    write_parquet(query, output, current_app.config['EXPORT_BATCH_SIZE'])
+    output.seek(0)
+
+    return send_file(
+        output,
+        mimetype='application/vnd.apache.parquet',
+        as_attachment=True,
+        download_name=f'jobs_export_{datetime.now().strftime("%Y%m%d")}.parquet'
+    )
+
+
 @api_bp.route('/sources')
 def list_sources():
     """List available sources"""
-    from app.services.job_aggregator import JobAggregator
+    from app.services.job_aggregator import get_aggregator
 
-    aggregator = JobAggregator(current_app.config)
-    sources = [f.SOURCE_NAME for f in aggregator.fetchers]
+    sources = get_aggregator(current_app._get_current_object()).source_names
 
     return jsonify({
         'sources': sources,
@@ -202,3 +377,22 @@ def stats():
         'manual': manual,
         'by_source': {source: count for source, count in source_counts}
     })
+
+
+@api_bp.route('/trends')
+def trends():
+    """Technology, volume and salary trends from the daily rollups"""
+    from app.services.rollups import get_trends
+
+    granularity = request.args.get('granularity', 'week')
+    if granularity not in ('day', 'week'):
+        return jsonify({'error': 'granularity must be day or week'}), 400
+
+    periods = min(max(request.args.get('periods', 12, type=int), 1), 366)
+    technologies = request.args.get('technologies')
+
+    return jsonify(get_trends(
+        periods=periods,
+        granularity=granularity,
+        technologies=[t.strip() for t in technologies.split(',') if t.strip()] if technologies else None
+    ))
@@ -0,0 +1,46 @@
+from typing import Dict
+from app import db
+from app.models import Job, Tag
+
+
+def parse_job_filters(args) -> Dict:
+    """Read the job list filters (dashboard, exports, JSON API) from request args"""
+    return {
+        'source': args.get('source'),
+        'job_type': args.get('job_type'),
+        'search': args.get('search') or '',
+        'bookmarked': args.get('bookmarked') == 'true',
+        'applied': args.get('applied') == 'true',
+        'tag': args.get('tag'),
+        'min_daily': args.get('min_daily', type=int),
+        'min_annual': args.get('min_annual', type=int),
+    }
+
+
+def apply_job_filters(query, filters: Dict):
+    """Apply parsed job filters to a Job query"""
+    if filters['source']:
+        query = query.filter(Job.source == filters['source'])
+    if filters['job_type']:
+        query = query.filter(Job.job_type == filters['job_type'])
+    if filters['search']:
+        search = filters['search']
+        query = query.filter(
+            db.or_(
+                Job.title.ilike(f'%{search}%'),
+                Job.company.ilike(f'%{search}%'),
+                Job.description_contains(search)
+            )
+        )
+    if filters['bookmarked']:
+        query = query.filter(Job.is_bookmarked == True)
+    if filters['applied']:
+        query = query.filter(Job.is_applied == True)
+    if filters['tag']:
+        query = query.filter(Job.tags.any(Tag.name == filters['tag']))
+    if filters['min_daily'] or filters['min_annual']:
+        from app.services.market_analyzer import annual_salary_floor
+
+        min_salary = annual_salary_floor(filters['min_daily'], filters['min_annual'])
+        query = query.filter(Job.salary_annual_max >= min_salary)
+    return query
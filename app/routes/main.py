@@ -1,66 +1,46 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, current_app, send_from_directory
 from app import db
-from app.models import Job, FetchLog
+from app.caching import current_data_version, versioned_view
+from app.models import Job, SavedSearch, SavedSearchMatch
+from app.routes.filters import parse_job_filters, apply_job_filters
 
 main_bp = Blueprint('main', __name__)
 
 
 @main_bp.route('/')
+@versioned_view
 def dashboard():
     """Main dashboard with job listings"""
-    # Get filter parameters
-    source = request.args.get('source')
-    job_type = request.args.get('job_type')
-    search = request.args.get('search')
-    bookmarked_only = request.args.get('bookmarked') == 'true'
-    applied_only = request.args.get('applied') == 'true'
-
-    # Build query
-    query = Job.query
-
-    if source:
-        query = query.filter(Job.source == source)
-    if job_type:
-        query = query.filter(Job.job_type == job_type)
-    if search:
-        query = query.filter(
-            db.or_(
-                Job.title.ilike(f'%{search}%'),
-                Job.company.ilike(f'%{search}%'),
-                Job.description.ilike(f'%{search}%')
-            )
-        )
-    if bookmarked_only:
-        query = query.filter(Job.is_bookmarked == True)
-    if applied_only:
-        query = query.filter(Job.is_applied == True)
+    from app.services.facets import facet_counts, last_fetch_time
+
+    filters = parse_job_filters(request.args)
+    query = apply_job_filters(Job.query, filters)
+
+    # Filter counts (and the total) come from the facet cache
+    version = current_data_version()
+    facets = facet_counts(filters, version)
 
     # Pagination
     page = request.args.get('page', 1, type=int)
     per_page = 20
 
     jobs = query.order_by(Job.posted_at.desc().nullslast(), Job.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+        page=page, per_page=per_page, error_out=False, count=False
     )
+    jobs.total = facets['total']
 
-    # Get sources for filter dropdown
-    sources = db.session.query(Job.source).distinct().all()
-
-    # Get last fetch time
-    last_fetch = FetchLog.query.order_by(FetchLog.fetched_at.desc()).first()
+    # Sources for the filter dropdown: the ones with matching jobs, plus the selected one
+    sources = list(facets['source'])
+    if filters['source'] and filters['source'] not in sources:
+        sources.append(filters['source'])
 
     return render_template(
         'dashboard.html',
         jobs=jobs,
-        sources=[s[0] for s in sources],
-        last_fetch=last_fetch,
-        current_filters={
-            'source': source,
-            'job_type': job_type,
-            'search': search or '',
-            'bookmarked': bookmarked_only,
-            'applied': applied_only
-        }
+        sources=sources,
+        facets=facets,
+        last_fetch=last_fetch_time(version),
+        current_filters=filters
     )
 
 
@@ -68,6 +48,10 @@ def dashboard():
 def new_job():
     """Manual job entry form"""
     if request.method == 'POST':
+        from app.events import broker
+        from app.services.rollups import update_rollups
+        from app.services.saved_searches import match_new_jobs
+
         job = Job(
             title=request.form['title'],
             company=request.form['company'],
@@ -80,8 +64,12 @@ def new_job():
             is_manual=True,
             notes=request.form.get('notes')
         )
+        job.normalize_salary()
         db.session.add(job)
+        update_rollups([job])
+        match_new_jobs([job])
         db.session.commit()
+        broker.publish('jobs', {'new_jobs': {'manual': 1}, 'total_new_jobs': 1})
         flash('Job added successfully!', 'success')
         return redirect(url_for('main.dashboard'))
 
@@ -89,6 +77,7 @@ def new_job():
 
 
 @main_bp.route('/jobs/<int:job_id>')
+@versioned_view
 def job_detail(job_id):
     """Single job detail view"""
     job = Job.query.get_or_404(job_id)
@@ -109,6 +98,7 @@ def edit_job(job_id):
         job.url = request.form.get('url')
         job.salary_text = request.form.get('salary')
         job.notes = request.form.get('notes')
+        job.normalize_salary()
         db.session.commit()
         flash('Job updated successfully!', 'success')
         return redirect(url_for('main.job_detail', job_id=job.id))
@@ -144,15 +134,134 @@ def toggle_applied(job_id):
     return redirect(request.referrer or url_for('main.dashboard'))
 
 
+@main_bp.route('/searches', methods=['GET', 'POST'])
+def saved_searches():
+    """Saved searches: list, and create from the dashboard filters"""
+    if request.method == 'POST':
+        filters = parse_job_filters(request.form)
+        name = (request.form.get('name') or '').strip() or filters['search'] or 'Recherche'
+        search = SavedSearch(
+            name=name[:255],
+            keywords=filters['search'],
+            source=filters['source'] or None,
+            job_type=filters['job_type'] or None,
+            tag=filters['tag'] or None,
+            min_daily=filters['min_daily'],
+            min_annual=filters['min_annual']
+        )
+        db.session.add(search)
+        db.session.commit()
+        flash(f'Saved search "{search.name}" created: new matching jobs will show up in "For you".', 'success')
+        return redirect(url_for('main.saved_searches'))
+
+    searches = SavedSearch.query.order_by(SavedSearch.name).all()
+    unseen = dict(
+        db.session.query(SavedSearchMatch.saved_search_id, db.func.count(SavedSearchMatch.id))
+        .filter(SavedSearchMatch.seen == False)
+        .group_by(SavedSearchMatch.saved_search_id)
+    )
+    return render_template('saved_searches.html', searches=searches, unseen=unseen)
+
+
+@main_bp.route('/searches/<int:search_id>/delete', methods=['POST'])
+def delete_saved_search(search_id):
+    """Delete a saved search and its matches"""
+    search = SavedSearch.query.get_or_404(search_id)
+    db.session.delete(search)
+    db.session.commit()
+    flash('Saved search deleted.', 'info')
+    return redirect(url_for('main.saved_searches'))
+
+
+@main_bp.route('/for-you')
+@versioned_view
+def for_you():
+    """Jobs matched by the saved searches at ingestion, most recent match first"""
+    search_id = request.args.get('search', type=int)
+    show_all = request.args.get('all') == 'true'
+
+    matched_at = db.func.max(SavedSearchMatch.matched_at)
+    query = db.session.query(Job, matched_at).join(SavedSearchMatch, SavedSearchMatch.job_id == Job.id)
+    if search_id:
+        query = query.filter(SavedSearchMatch.saved_search_id == search_id)
+    if not show_all:
+        query = query.filter(SavedSearchMatch.seen == False)
+
+    page = request.args.get('page', 1, type=int)
+    results = query.group_by(Job.id).order_by(matched_at.desc(), Job.id.desc()).paginate(
+        page=page, per_page=20, error_out=False
+    )
+
+    # Names of the searches each job matched
+    job_ids = [job.id for job, _ in results.items]
+    matched_by = {}
+    if job_ids:
+        rows = db.session.query(SavedSearchMatch.job_id, SavedSearch.name).join(SavedSearch) \
+            .filter(SavedSearchMatch.job_id.in_(job_ids)).order_by(SavedSearch.name)
+        for job_id, name in rows:
+            matched_by.setdefault(job_id, []).append(name)
+
+    return render_template(
+        'for_you.html',
+        results=results,
+        matched_by=matched_by,
+        searches=SavedSearch.query.order_by(SavedSearch.name).all(),
+        current_search=search_id,
+        show_all=show_all
+    )
+
+
+@main_bp.route('/for-you/seen', methods=['POST'])
+def mark_matches_seen():
+    """Mark the new matches (of one saved search, or all) as seen"""
+    query = SavedSearchMatch.query.filter(SavedSearchMatch.seen == False)
+    search_id = request.form.get('search', type=int)
+    if search_id:
+        query = query.filter(SavedSearchMatch.saved_search_id == search_id)
+    query.update({SavedSearchMatch.seen: True}, synchronize_session=False)
+    db.session.commit()
+    return redirect(url_for('main.for_you', search=search_id or None))
+
+
 @main_bp.route('/analytics')
+@versioned_view(daily=True)
 def analytics():
     """Market analytics dashboard"""
-    from app.services.market_analyzer import MarketAnalyzer
+    from app.services.market_analyzer import MarketAnalyzer, job_rows_query
+    from app.services.rollups import get_trends
 
-    # Get all jobs for analysis
-    jobs = Job.query.all()
+    # Stream only the analyzed columns, never full Job objects
+    rows = job_rows_query().yield_per(1000)
 
-    analyzer = MarketAnalyzer(jobs)
+    analyzer = MarketAnalyzer(
+        rows,
+        workers=current_app.config['ANALYZER_WORKERS'],
+        parallel_min_jobs=current_app.config['ANALYZER_PARALLEL_MIN_JOBS']
+    )
     analysis = analyzer.get_full_analysis()
 
-    return render_template('analytics.html', analysis=analysis)
+    return render_template('analytics.html', analysis=analysis, trends=get_trends(periods=12, top=5))
+
+
+@main_bp.route('/profiles')
+def profiles():
+    """Recent cProfile/tracemalloc reports"""
+    from app.profiling import list_profiles
+
+    if not current_app.config.get('PROFILING_ENABLED'):
+        abort(404)
+
+    return render_template('profiles.html', profiles=list_profiles(current_app.config['PROFILE_DIR']))
+
+
+@main_bp.route('/profiles/<name>.<ext>')
+def profile_report(name, ext):
+    """Download a single profile report (.txt or .pstats)"""
+    if not current_app.config.get('PROFILING_ENABLED') or ext not in ('txt', 'pstats'):
+        abort(404)
+
+    return send_from_directory(
+        current_app.config['PROFILE_DIR'],
+        f'{name}.{ext}',
+        mimetype='text/plain' if ext == 'txt' else 'application/octet-stream'
+    )
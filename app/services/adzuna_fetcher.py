@@ -1,6 +1,7 @@
 import requests
-from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
 
 
 class AdzunaFetcher(BaseFetcher):
@@ -13,6 +14,11 @@ class AdzunaFetcher(BaseFetcher):
 
     SOURCE_NAME = "adzuna"
     API_URL = "https://api.adzuna.com/v1/api/jobs"
+    # Free plan: 25 requests/minute, so pages are walked one at a time
+    MAX_PAGES = 10
+    PAGE_WORKERS = 1
+    QUERY_PARAM = 'keywords'
+    SCOPE_PARAMS = {'country': 'fr'}
 
     # Keywords to search for cloud/AWS jobs
     SEARCH_KEYWORDS = [
@@ -28,51 +34,82 @@ class AdzunaFetcher(BaseFetcher):
     def is_configured(self) -> bool:
         return bool(self.app_id and self.api_key)
 
+    def default_queries(self) -> List[str]:
+        return list(self.SEARCH_KEYWORDS)
+
     def fetch_jobs(
         self,
         country: str = 'fr',
         keywords: List[str] = None,
         results_per_page: int = 50,
+        since: Dict[str, datetime] = None,
+        watermarks: Dict[str, datetime] = None,
+        budget: FetchBudget = None,
+        query_stats: Dict[str, Dict] = None,
         **kwargs
     ) -> List[JobData]:
+        """
+        Search every keyword, newest first, walking pages until one holds
+        only jobs older than since[keyword]. Completed keywords get their
+        newest posted_at in `watermarks`; stops early when `budget` runs out.
+        Requests and ids per keyword go to `query_stats`.
+        """
         if not self.is_configured():
             return []
 
         if keywords is None:
             keywords = self.SEARCH_KEYWORDS
+        since = since or {}
+        budget = budget or FetchBudget()
 
         all_jobs = {}
 
         for keyword in keywords:
-            try:
-                # Search multiple pages
-                for page in [1, 2]:
-                    url = f"{self.API_URL}/{country}/search/{page}"
-
-                    params = {
-                        'app_id': self.app_id,
-                        'app_key': self.api_key,
-                        'results_per_page': results_per_page,
-                        'what': keyword,
-                        'content-type': 'application/json'
-                    }
-
-                    response = requests.get(url, params=params, timeout=30)
-                    if response.status_code != 200:
-                        continue
-
-                    data = response.json()
-                    jobs = data.get('results', [])
-
-                    for job in jobs:
-                        job_id = str(job.get('id', ''))
-                        if job_id and job_id not in all_jobs:
-                            all_jobs[job_id] = job
-
-            except Exception:
-                continue
-
-        return [self.normalize_job(job) for job in all_jobs.values()]
+            if budget.stop(len(all_jobs)):
+                break
+
+            jobs, complete = self._walk_pages(
+                lambda page, keyword=keyword: self._search_page(
+                    country, keyword, results_per_page, page, budget.timeout()
+                ),
+                since=since.get(keyword),
+                budget=budget,
+                context=keyword,
+                query_stats=query_stats
+            )
+            if complete:
+                self._record_watermark(watermarks, keyword, jobs, since.get(keyword))
+
+            for job in jobs:
+                if job.external_id and job.external_id not in all_jobs:
+                    all_jobs[job.external_id] = job
+
+        return list(all_jobs.values())
+
+    def _search_page(
+        self, country: str, keyword: str, results_per_page: int, page: int, timeout: float = 30
+    ) -> Tuple[List[JobData], Optional[int]]:
+        """One page of results and the total number of pages"""
+        url = f"{self.API_URL}/{country}/search/{page + 1}"
+
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.api_key,
+            'results_per_page': results_per_page,
+            'what': keyword,
+            'sort_by': 'date',
+            'content-type': 'application/json'
+        }
+
+        response = requests.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+
+        data = response.json()
+        total_pages = None
+        if data.get('count') is not None:
+            total_pages = -(-int(data['count']) // results_per_page)
+
+        return [self.normalize_job(job) for job in data.get('results', [])], total_pages
 
     def normalize_job(self, raw_job: Dict) -> JobData:
         salary_min = raw_job.get('salary_min')
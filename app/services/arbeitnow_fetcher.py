@@ -1,7 +1,7 @@
 import requests
 from datetime import datetime
 from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
 
 
 class ArbeitnowFetcher(BaseFetcher):
@@ -15,10 +15,11 @@ class ArbeitnowFetcher(BaseFetcher):
     SOURCE_NAME = "arbeitnow"
     API_URL = "https://www.arbeitnow.com/api/job-board-api"
 
-    def fetch_jobs(self, **kwargs) -> List[JobData]:
+    def fetch_jobs(self, budget: FetchBudget = None, **kwargs) -> List[JobData]:
+        budget = budget or FetchBudget()
         response = requests.get(
             self.API_URL,
-            timeout=30
+            timeout=budget.timeout(30)
         )
         response.raise_for_status()
 
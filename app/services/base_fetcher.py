@@ -1,7 +1,9 @@
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 
 
 @dataclass
@@ -24,11 +26,64 @@ class JobData:
     tags: List[str] = field(default_factory=list)
 
 
+class FetchBudget:
+    """
+    Limits for one source fetch, and what happened during it.
+
+    Fetchers check `stop()` between requests and use `timeout()` for each
+    HTTP call, so a source returns what it has once its time is up or it
+    holds `max_jobs` jobs. Errors on individual keywords or pages are
+    recorded in `errors` instead of being silently dropped.
+    """
+
+    def __init__(self, seconds: float = None, max_jobs: int = None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.max_jobs = max_jobs or None
+        self.errors: List[str] = []
+        self.exhausted: Optional[str] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, None when unlimited"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def timeout(self, default: float = 30) -> float:
+        """HTTP timeout for the next request, capped by the time left"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(min(default, remaining), 1.0)
+
+    def stop(self, job_count: int = 0) -> bool:
+        """True once the time is up or `job_count` reached max_jobs"""
+        if self.max_jobs is not None and job_count >= self.max_jobs:
+            self.exhausted = self.exhausted or 'max_jobs'
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.exhausted = self.exhausted or 'time'
+        return self.exhausted is not None
+
+    def record_error(self, context: str, error: Exception):
+        self.errors.append(f'{context}: {error}' if context else str(error))
+
+
 class BaseFetcher(ABC):
     """Abstract base class for all job fetchers"""
 
     SOURCE_NAME: str = "unknown"
 
+    # Pagination (sources walked with _walk_pages)
+    MAX_PAGES: int = 1
+    PAGE_WORKERS: int = 1
+
+    # fetch_jobs argument holding the list of search queries, for sources
+    # whose queries are planned by query_planner (None: not planned)
+    QUERY_PARAM: Optional[str] = None
+
+    # fetch_jobs arguments that narrow the search (country, location...),
+    # with their default values: high-water marks are kept per scope
+    SCOPE_PARAMS: Dict[str, Optional[str]] = {}
+
     @abstractmethod
     def fetch_jobs(self, **kwargs) -> List[JobData]:
         """Fetch jobs from the source. Returns normalized JobData list."""
@@ -42,6 +97,135 @@ class BaseFetcher(ABC):
     def get_source_name(self) -> str:
         return self.SOURCE_NAME
 
+    def default_queries(self) -> List[str]:
+        """Queries sent when the caller gives none (QUERY_PARAM sources)"""
+        return []
+
+    def watermark_scope(self, **kwargs) -> str:
+        """
+        Scope of a fetch_jobs call: its non-default SCOPE_PARAMS as sorted
+        'name=value' pairs ('country=de'), '' for the default search. A
+        high-water mark reached in one scope says nothing about another.
+        """
+        return '&'.join(
+            f'{name}={kwargs[name]}'
+            for name, default in sorted(self.SCOPE_PARAMS.items())
+            if kwargs.get(name) not in (None, '', default)
+        )
+
+    def _walk_pages(
+        self,
+        fetch_page: Callable[[int], Tuple[List[JobData], Optional[int]]],
+        since: Optional[datetime] = None,
+        budget: FetchBudget = None,
+        context: str = '',
+        query_stats: Optional[Dict[str, Dict]] = None
+    ) -> Tuple[List[JobData], bool]:
+        """
+        Fetch pages 0, 1, 2... of a search, newest jobs first.
+
+        `fetch_page(page)` returns the page's jobs and, when the API says so,
+        the total number of pages. The walk stops at an empty page, at the
+        last page (or MAX_PAGES), or after a page whose jobs are all older
+        than `since`. Without `since` (full walk), pages after the first are
+        fetched PAGE_WORKERS at a time; with it, one at a time since the
+        walk is expected to stop after a page or two.
+
+        The walk also stops when the budget runs out; failed pages are
+        recorded in the budget as `context` errors. Requests made and ids
+        found are recorded in `query_stats[context]`, unless a page failed:
+        an outage says nothing about the query's yield.
+
+        Returns (jobs, complete); complete is False if a page failed or the
+        budget ran out, in which case the jobs fetched so far are returned.
+        """
+        jobs: List[JobData] = []
+        calls = 0
+        failed = False
+        try:
+            since = _naive_utc(since)
+            budget = budget or FetchBudget()
+
+            def exhausted(page_jobs: List[JobData]) -> bool:
+                if not page_jobs:
+                    return True
+                if since is None:
+                    return False
+                return all(
+                    job.posted_at is not None and _naive_utc(job.posted_at) < since
+                    for job in page_jobs
+                )
+
+            if budget.stop():
+                return jobs, False
+            calls += 1
+            try:
+                page_jobs, total_pages = fetch_page(0)
+            except Exception as e:
+                budget.record_error(context, e)
+                failed = True
+                return jobs, False
+            jobs.extend(page_jobs)
+            if exhausted(page_jobs):
+                return jobs, True
+
+            last_page = self.MAX_PAGES - 1
+            if total_pages is not None:
+                last_page = min(last_page, total_pages - 1)
+
+            wave_size = max(self.PAGE_WORKERS, 1) if since is None else 1
+            page = 1
+            with ThreadPoolExecutor(max_workers=wave_size) as executor:
+                while page <= last_page:
+                    if budget.stop(len(jobs)):
+                        return jobs, False
+                    wave = range(page, min(page + wave_size, last_page + 1))
+                    futures = [executor.submit(fetch_page, number) for number in wave]
+                    calls += len(futures)
+                    # Pages are consumed in order so that a failure or an old
+                    # page stops the walk at the right place
+                    for future in futures:
+                        try:
+                            page_jobs, _ = future.result()
+                        except Exception as e:
+                            budget.record_error(context, e)
+                            failed = True
+                            return jobs, False
+                        jobs.extend(page_jobs)
+                        if exhausted(page_jobs):
+                            return jobs, True
+                    page += len(wave)
+
+            return jobs, True
+        finally:
+            if not failed:
+                self._record_query(query_stats, context, (job.external_id for job in jobs), calls)
+
+    @staticmethod
+    def _record_query(query_stats: Optional[Dict[str, Dict]], query: str, ids: Iterable[str], calls: int):
+        """Requests made and external ids found by one query (see query_planner)"""
+        if query_stats is None:
+            return
+        stats = query_stats.setdefault(query or '', {'calls': 0, 'ids': []})
+        stats['calls'] += calls
+        stats['ids'].extend(ids)
+
+    @staticmethod
+    def _record_watermark(
+        watermarks: Optional[Dict[str, datetime]],
+        keyword: str,
+        jobs: List[JobData],
+        since: Optional[datetime] = None
+    ):
+        """Store the newest posted_at of a completed search in `watermarks`"""
+        if watermarks is None:
+            return
+        dates = [_naive_utc(job.posted_at) for job in jobs if job.posted_at is not None]
+        if since is not None:
+            dates.append(_naive_utc(since))
+        if dates:
+            watermarks[keyword or ''] = max(dates)
+
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime, handling common formats"""
         if not date_str:
@@ -67,3 +251,10 @@ class BaseFetcher(ABC):
             pass
 
         return None
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Aware datetimes converted to naive UTC, as stored in the database"""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
@@ -0,0 +1,341 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from flask import current_app
+from app import db
+from app.models import Job
+from app.services.ingest import LOOKUP_BATCH_SIZE
+from app.services.urls import url_fingerprint
+
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Invalid and duplicate rows listed in the report (the counters stay exact past it)
+MAX_REPORTED_ROWS = 1000
+
+TEXT_FIELDS = (
+    'title', 'company', 'description', 'location', 'job_type', 'salary_text',
+    'salary_currency', 'url', 'company_logo', 'source_category', 'notes',
+)
+INTEGER_FIELDS = ('salary_min', 'salary_max')
+BOOLEAN_FIELDS = ('is_bookmarked', 'is_applied')
+DATE_FIELDS = ('posted_at',)
+IMPORT_FIELDS = TEXT_FIELDS + INTEGER_FIELDS + BOOLEAN_FIELDS + DATE_FIELDS
+
+# Sizes of the String columns (description and notes are unbounded)
+MAX_LENGTHS = {
+    field: Job.__table__.c[field].type.length
+    for field in TEXT_FIELDS
+    if field in Job.__table__.c and getattr(Job.__table__.c[field].type, 'length', None)
+}
+
+# url is required: it is what duplicates are detected on
+REQUIRED_FIELDS = ('title', 'company', 'url')
+
+# Other column names accepted, so that the CSV and NDJSON exports import back.
+# The original platform (LinkedIn, Free-Work...) goes to source_category:
+# imported jobs are manual jobs.
+FIELD_ALIASES = {
+    'salary': 'salary_text',
+    'link': 'url',
+    'job_url': 'url',
+    'type': 'job_type',
+    'source': 'source_category',
+    'platform': 'source_category',
+    'bookmarked': 'is_bookmarked',
+    'applied': 'is_applied',
+    'date': 'posted_at',
+}
+
+JOB_TYPE_ALIASES = {
+    'fulltime': 'full-time',
+    'parttime': 'part-time',
+    'cdi': 'full-time',
+    'cdd': 'contract',
+    'freelancer': 'freelance',
+}
+
+TRUE_VALUES = frozenset({'1', 'true', 'yes', 'y', 'oui', 'x'})
+FALSE_VALUES = frozenset({'0', 'false', 'no', 'n', 'non'})
+
+# Besides ISO 8601
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%Y %H:%M')
+
+
+def detect_format(filename: Optional[str]) -> Tuple[Optional[str], bool]:
+    """(format, gzipped) from a file name: .csv, .ndjson or .jsonl, optionally .gz"""
+    name = (filename or '').lower()
+    gzipped = name.endswith('.gz')
+    if gzipped:
+        name = name[:-3]
+    if name.endswith('.csv'):
+        return 'csv', gzipped
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson', gzipped
+    return None, gzipped
+
+
+@lru_cache(maxsize=256)
+def _column_name(column: str) -> str:
+    return column.strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def column_field(column: str) -> Optional[str]:
+    """Job field of an input column ('Job Type' -> 'job_type'), None if not imported"""
+    name = _column_name(column)
+    name = FIELD_ALIASES.get(name, name)
+    return name if name in IMPORT_FIELDS else None
+
+
+def _parse_datetime(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_value(field: str, value):
+    """Normalized value of one field (None if empty); ValueError if invalid"""
+    if isinstance(value, (dict, list)):
+        raise ValueError(f'{field} must be a single value')
+    if isinstance(value, bool) and field in BOOLEAN_FIELDS:
+        return value
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    if field in TEXT_FIELDS:
+        if field in ('title', 'company', 'location'):
+            text = ' '.join(text.split())
+        elif field == 'job_type':
+            text = text.lower().replace(' ', '-').replace('_', '-')
+            text = JOB_TYPE_ALIASES.get(text.replace('-', ''), text)
+        elif field == 'salary_currency':
+            text = text.upper()
+
+        if len(text) > MAX_LENGTHS.get(field, len(text)):
+            raise ValueError(f'{field} is longer than {MAX_LENGTHS[field]} characters')
+        if field in ('url', 'company_logo') and url_fingerprint(text) is None:
+            raise ValueError(f'{field} is not an http(s) URL')
+        return text
+
+    if field in INTEGER_FIELDS:
+        try:
+            return int(float(text.replace(' ', '').replace('\u00a0', '')))
+        except ValueError:
+            raise ValueError(f'{field} is not a number') from None
+
+    if field in BOOLEAN_FIELDS:
+        text = text.lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f'{field} is not a yes/no value')
+
+    try:
+        return _parse_datetime(text)
+    except ValueError:
+        raise ValueError(f'{field} is not a date (YYYY-MM-DD or DD/MM/YYYY)') from None
+
+
+def job_from_row(record: Dict) -> Tuple[Optional[Job], List[str]]:
+    """
+    Validate and normalize one input row. Returns a salary-normalized
+    manual Job, or None and the row's errors.
+    """
+    fields = {}
+    errors = []
+    invalid = set()
+    for column, value in record.items():
+        if not isinstance(column, str) or value is None:
+            continue
+        field = column_field(column)
+        # An alias (`salary`, `source`...) never overrides the field's own column
+        if field is None or (field in fields and _column_name(column) != field):
+            continue
+        try:
+            parsed = _parse_value(field, value)
+        except ValueError as e:
+            errors.append(str(e))
+            invalid.add(field)
+            continue
+        if parsed is not None:
+            fields[field] = parsed
+
+    errors.extend(
+        f'{field} is required' for field in REQUIRED_FIELDS
+        if field not in fields and field not in invalid
+    )
+    if errors:
+        return None, errors
+
+    job = Job(source='manual', is_manual=True, **fields)
+    job.normalize_salary()
+    return job, []
+
+
+def iter_rows(stream, fmt: str, encoding: str = 'utf-8-sig') -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Rows of a binary stream as (line number, record, error), read lazily.
+
+    CSV files need a header line; the delimiter (`,`, `;` or tab, as
+    spreadsheets export them) is guessed from it. A row spanning several
+    lines is reported on its last one.
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+    if fmt == 'ndjson':
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f'invalid JSON: {e}'
+                continue
+            if isinstance(record, dict):
+                yield line_number, record, None
+            else:
+                yield line_number, None, 'not a JSON object'
+        return
+
+    header = text.readline()
+    if not header.strip():
+        return
+    delimiter = max((',', ';', '\t'), key=header.count)
+    reader = csv.DictReader(chain([header], text), delimiter=delimiter)
+
+    fields = {column_field(column) for column in reader.fieldnames or () if column}
+    missing = [field for field in REQUIRED_FIELDS if field not in fields]
+    if missing:
+        raise ValueError(f'missing column(s): {", ".join(missing)}')
+
+    for record in reader:
+        yield reader.line_num, record, None
+
+
+def existing_fingerprints(fingerprints: Iterable[str]) -> Dict[str, int]:
+    """{url fingerprint: job id} for the fingerprints already in the database"""
+    fingerprints = list(dict.fromkeys(fingerprints))
+    found = {}
+    for start in range(0, len(fingerprints), LOOKUP_BATCH_SIZE):
+        batch = fingerprints[start:start + LOOKUP_BATCH_SIZE]
+        rows = db.session.query(Job.url_fingerprint, Job.id).filter(Job.url_fingerprint.in_(batch))
+        found.update(rows)
+    return found
+
+
+def import_jobs(
+    stream,
+    fmt: str,
+    gzipped: bool = False,
+    encoding: str = 'utf-8-sig',
+    batch_size: int = None,
+    dry_run: bool = False
+) -> Dict:
+    """
+    Import manual jobs from a CSV or NDJSON stream.
+
+    Rows are read, validated and normalized one at a time. Valid rows are
+    deduplicated on their URL fingerprint, against the jobs of every source
+    and the previous rows of the file, then committed every `batch_size`
+    jobs (INGEST_BATCH_SIZE) with their rollups and saved-search matches.
+    With `dry_run` nothing is written.
+
+    Returns the report: row counters, invalid rows with their errors,
+    duplicate rows with the job or line they repeat. An unreadable file
+    stops the import (`error`); batches committed before stay.
+    """
+    from app.services.rollups import update_rollups
+    from app.services.saved_searches import load_percolator, match_new_jobs
+
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f'unknown format {fmt!r} (expected {" or ".join(IMPORT_FORMATS)})')
+    if batch_size is None:
+        batch_size = current_app.config.get('INGEST_BATCH_SIZE', 500)
+
+    report = {
+        'format': fmt,
+        'dry_run': dry_run,
+        'rows': 0,
+        'imported': 0,
+        'duplicates': 0,
+        'invalid': 0,
+        'errors': [],
+        'duplicate_rows': [],
+    }
+    percolator = None if dry_run else load_percolator()
+    first_lines: Dict[str, int] = {}  # fingerprint -> first line seen in the file
+    pending: List[Tuple[int, Job]] = []
+
+    def flush():
+        existing = existing_fingerprints(job.url_fingerprint for _, job in pending)
+        created = []
+        for line, job in pending:
+            job_id = existing.get(job.url_fingerprint)
+            if job_id is None:
+                created.append(job)
+            else:
+                report['duplicates'] += 1
+                if len(report['duplicate_rows']) < MAX_REPORTED_ROWS:
+                    report['duplicate_rows'].append({'line': line, 'job_id': job_id})
+        if created and not dry_run:
+            db.session.add_all(created)
+            update_rollups(created)
+            if percolator is not None:
+                match_new_jobs(created, percolator)
+            db.session.commit()
+        report['imported'] += len(created)
+        pending.clear()
+
+    if gzipped:
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+
+    try:
+        for line, record, error in iter_rows(stream, fmt, encoding):
+            report['rows'] += 1
+            errors = [error] if error else None
+            if record is not None:
+                job, errors = job_from_row(record)
+            if errors:
+                report['invalid'] += 1
+                if len(report['errors']) < MAX_REPORTED_ROWS:
+                    report['errors'].append({'line': line, 'errors': errors})
+                continue
+
+            first_line = first_lines.setdefault(job.url_fingerprint, line)
+            if first_line != line:
+                report['duplicates'] += 1
+                if len(report['duplicate_rows']) < MAX_REPORTED_ROWS:
+                    report['duplicate_rows'].append({'line': line, 'same_as_line': first_line})
+                continue
+
+            pending.append((line, job))
+            if len(pending) >= batch_size:
+                flush()
+    except UnicodeDecodeError as e:
+        report['error'] = f'not {encoding} text after row {report["rows"]} ({e.reason}): set the encoding, e.g. cp1252'
+    except (ValueError, OSError, EOFError, csv.Error) as e:
+        # Unreadable file (gzip, CSV syntax, header): keep what is valid so far
+        report['error'] = str(e)
+
+    if pending:
+        flush()
+    return report
@@ -1,7 +1,9 @@
 import requests
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlencode
-from .base_fetcher import BaseFetcher, JobData
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
+from .urls import url_fingerprint
 
 
 class CareerjetFetcher(BaseFetcher):
@@ -15,6 +17,9 @@ class CareerjetFetcher(BaseFetcher):
 
     SOURCE_NAME = "careerjet"
     API_URL = "https://public.api.careerjet.net/search"
+    MAX_PAGES = 10
+    PAGE_WORKERS = 2
+    SCOPE_PARAMS = {'location': 'france', 'contracttype': None}
 
     def __init__(self, affid: str = None):
         """
@@ -31,40 +36,64 @@ class CareerjetFetcher(BaseFetcher):
         keywords: str = "développeur",
         location: str = "france",
         pagesize: int = 99,
-        page: int = 1,
         contracttype: str = None,
+        since: Dict[str, datetime] = None,
+        watermarks: Dict[str, datetime] = None,
+        budget: FetchBudget = None,
         **kwargs
     ) -> List[JobData]:
         """
         Rechercher des offres
 
+        Les pages sont parcourues par date décroissante jusqu'à une page dont
+        toutes les offres sont plus anciennes que since[keywords].
+
         Args:
-            keywords: Mots-clés de recherche
+            keywords: Mots-clés de recherche (chaîne ou liste)
             location: Lieu (ville, région, pays)
-            pagesize: Nombre de résultats (max 99)
-            page: Numéro de page
+            pagesize: Nombre de résultats par page (max 99)
             contracttype: 'p' (permanent/CDI), 'c' (contract/CDD), etc.
+            since: Date de la dernière offre déjà récupérée, par mot-clé
+            watermarks: Rempli avec la nouvelle date si la recherche est complète
+            budget: Limites de temps / nombre d'offres
         """
         if not self.is_configured():
             return []
 
+        if isinstance(keywords, (list, tuple)):
+            keywords = ' '.join(keywords)
+        since = since or {}
+        budget = budget or FetchBudget()
+
         params = {
             'affid': self.affid,
             'locale_code': 'fr_FR',
             'keywords': keywords,
             'location': location,
             'pagesize': pagesize,
-            'page': page,
             'sort': 'date',  # Tri par date
         }
 
         if contracttype:
             params['contracttype'] = contracttype
 
+        jobs, complete = self._walk_pages(
+            lambda page: self._search_page(params, page, budget.timeout()),
+            since=since.get(keywords),
+            budget=budget,
+            context=keywords
+        )
+        if complete:
+            self._record_watermark(watermarks, keywords, jobs, since.get(keywords))
+
+        return jobs
+
+    def _search_page(self, params: Dict, page: int, timeout: float = 30) -> Tuple[List[JobData], Optional[int]]:
+        """Une page de résultats et le nombre total de pages"""
         response = requests.get(
             self.API_URL,
-            params=params,
-            timeout=30
+            params={**params, 'page': page + 1},
+            timeout=timeout
         )
         response.raise_for_status()
 
@@ -72,9 +101,9 @@ class CareerjetFetcher(BaseFetcher):
 
         if data.get('type') == 'JOBS':
             jobs = data.get('jobs', [])
-            return [self.normalize_job(job) for job in jobs]
+            return [self.normalize_job(job) for job in jobs], data.get('pages')
 
-        return []
+        return [], 0
 
     def normalize_job(self, raw_job: Dict) -> JobData:
         # Type de contrat
@@ -91,7 +120,7 @@ class CareerjetFetcher(BaseFetcher):
         salary = raw_job.get('salary', '')
 
         return JobData(
-            external_id=str(hash(raw_job.get('url', ''))),
+            external_id=url_fingerprint(raw_job.get('url')) or '',
             title=raw_job.get('title', ''),
             company=raw_job.get('company', 'Non spécifié'),
             description=raw_job.get('description', ''),
@@ -0,0 +1,126 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List
+from sqlalchemy.orm import selectinload
+from app.models import Job
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+
+# Every Job column, plus tags; same names as Job.to_dict()
+EXPORT_FIELDS = Job.SERIALIZABLE_FIELDS + ('updated_at',)
+
+
+def iter_job_batches(query, batch_size: int = 1000) -> Iterator[List[Job]]:
+    """
+    Jobs of a (filtered) query, newest id first, in batches of `batch_size`.
+
+    Batches are keyset-paginated on the id, with tags and descriptions
+    loaded per batch. The session only keeps weak references to unmodified
+    objects, so memory stays flat on large exports.
+    """
+    last_id = None
+    while True:
+        batch_query = query
+        if last_id is not None:
+            batch_query = batch_query.filter(Job.id < last_id)
+        jobs = batch_query.options(
+            selectinload(Job.tags), selectinload(Job.description_row)
+        ).order_by(Job.id.desc()).limit(batch_size).all()
+        if not jobs:
+            return
+
+        yield jobs
+
+        last_id = jobs[-1].id
+        if len(jobs) < batch_size:
+            return
+
+
+def export_record(job: Job) -> Dict:
+    """All exported fields, with native types (datetimes stay datetimes)"""
+    record = {}
+    for field in EXPORT_FIELDS:
+        if field == 'tags':
+            record[field] = [tag.name for tag in job.tags]
+        else:
+            record[field] = getattr(job, field)
+    return record
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def ndjson_chunks(query, batch_size: int = 1000, compress: bool = False) -> Iterator[bytes]:
+    """
+    Newline-delimited JSON, one chunk per batch, gzip-compressed on the fly
+    when `compress` is set. Dates are ISO 8601 strings.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip container
+
+    for jobs in iter_job_batches(query, batch_size):
+        chunk = ''.join(
+            json.dumps(export_record(job), ensure_ascii=False, default=_json_default) + '\n'
+            for job in jobs
+        ).encode('utf-8')
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def parquet_schema():
+    """Typed Parquet schema for EXPORT_FIELDS (requires pyarrow)"""
+    timestamp = pa.timestamp('us')
+    types = {
+        'id': pa.int64(),
+        'salary_min': pa.int64(),
+        'salary_max': pa.int64(),
+        'salary_annual_min': pa.int64(),
+        'salary_annual_max': pa.int64(),
+        'is_manual': pa.bool_(),
+        'is_bookmarked': pa.bool_(),
+        'is_applied': pa.bool_(),
+        'posted_at': timestamp,
+        'fetched_at': timestamp,
+        'created_at': timestamp,
+        'updated_at': timestamp,
+        'tags': pa.list_(pa.string()),
+    }
+    return pa.schema([(field, types.get(field, pa.string())) for field in EXPORT_FIELDS])
+
+
+def write_parquet(query, fileobj, batch_size: int = 1000) -> int:
+    """
+    Write the jobs of a query to `fileobj` as Parquet, one row group per
+    batch. Returns the number of rows written.
+    """
+    if pa is None:
+        raise RuntimeError('Parquet export requires pyarrow (pip install pyarrow)')
+
+    schema = parquet_schema()
+    rows = 0
+    with pq.ParquetWriter(fileobj, schema, compression='zstd') as writer:
+        for jobs in iter_job_batches(query, batch_size):
+            columns = {field: [] for field in EXPORT_FIELDS}
+            for job in jobs:
+                for field, value in export_record(job).items():
+                    columns[field].append(value)
+            writer.write_table(pa.table(columns, schema=schema))
+            rows += len(jobs)
+    return rows
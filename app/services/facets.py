@@ -0,0 +1,107 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from app import db
+from app.caching import PageCache, current_data_version
+from app.models import Job, FetchLog, Tag
+from app.routes.filters import apply_job_filters
+
+
+# Tags shown in the filter sidebar, most frequent first
+TAG_FACET_LIMIT = 20
+
+# Filters that get counts. Each facet is counted with every filter but its
+# own, so that the other values of a facet stay selectable.
+FACET_FILTERS = ('source', 'job_type', 'bookmarked', 'applied', 'tag')
+
+# Facets per (filters, data version): entries go stale on the next write
+facet_cache = PageCache(max_size=256)
+
+
+def _without(filters: Dict, *names) -> Dict:
+    cleared = dict(filters)
+    for name in names:
+        cleared[name] = False if name in ('bookmarked', 'applied') else None
+    return cleared
+
+
+def _row_matches(filters: Dict, source, job_type, is_bookmarked, is_applied, skip: str) -> bool:
+    """Whether a grouped row passes the facet filters, except `skip`"""
+    if skip != 'source' and filters['source'] and source != filters['source']:
+        return False
+    if skip != 'job_type' and filters['job_type'] and job_type != filters['job_type']:
+        return False
+    if skip != 'bookmarked' and filters['bookmarked'] and not is_bookmarked:
+        return False
+    if skip != 'applied' and filters['applied'] and not is_applied:
+        return False
+    return True
+
+
+def compute_facets(filters: Dict) -> Dict:
+    """
+    Counts per source, job type, bookmarked/applied and tag for a filter set.
+
+    One query groups the jobs matching the non-facet filters (search,
+    salary floor, tag) by (source, job_type, is_bookmarked, is_applied);
+    the counts of those four facets are derived from its rows. Tags need
+    the job_tags join and get a second grouped query.
+    """
+    count = db.func.count(Job.id)
+    grouped = apply_job_filters(
+        db.session.query(Job.source, Job.job_type, Job.is_bookmarked, Job.is_applied, count),
+        _without(filters, 'source', 'job_type', 'bookmarked', 'applied')
+    ).group_by(Job.source, Job.job_type, Job.is_bookmarked, Job.is_applied).all()
+
+    sources, job_types = Counter(), Counter()
+    total = bookmarked = applied = 0
+    for source, job_type, is_bookmarked, is_applied, n in grouped:
+        row = (source, job_type, is_bookmarked, is_applied)
+        if _row_matches(filters, *row, skip='source'):
+            sources[source] += n
+        if job_type and _row_matches(filters, *row, skip='job_type'):
+            job_types[job_type] += n
+        if is_bookmarked and _row_matches(filters, *row, skip='bookmarked'):
+            bookmarked += n
+        if is_applied and _row_matches(filters, *row, skip='applied'):
+            applied += n
+        if _row_matches(filters, *row, skip=None):
+            total += n
+
+    tags = apply_job_filters(
+        db.session.query(Tag.name, count).select_from(Job).join(Job.tags),
+        _without(filters, 'tag')
+    ).group_by(Tag.name).order_by(count.desc(), Tag.name).limit(TAG_FACET_LIMIT).all()
+
+    return {
+        'total': total,
+        'source': dict(sorted(sources.items(), key=lambda item: (-item[1], item[0]))),
+        'job_type': dict(sorted(job_types.items(), key=lambda item: (-item[1], item[0]))),
+        'bookmarked': bookmarked,
+        'applied': applied,
+        'tag': dict(tags),
+    }
+
+
+def facet_counts(filters: Dict, version: int = None) -> Dict:
+    """compute_facets, cached until the data version changes"""
+    if version is None:
+        version = current_data_version()
+    key = ('facets', tuple(sorted(filters.items())), version)
+    facets = facet_cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        facet_cache.set(key, facets)
+    return facets
+
+
+def last_fetch_time(version: int = None) -> Optional[datetime]:
+    """Time of the latest fetch of any source, cached like the facets"""
+    if version is None:
+        version = current_data_version()
+    key = ('last_fetch', version)
+    cached = facet_cache.get(key)
+    if cached is None:
+        cached = (db.session.query(db.func.max(FetchLog.fetched_at)).scalar(),)
+        facet_cache.set(key, cached)
+    return cached[0]
@@ -1,7 +1,9 @@
+import re
 import requests
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
-from .base_fetcher import BaseFetcher, JobData
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
+from .token_cache import get_token_cache
 
 
 class FranceTravailFetcher(BaseFetcher):
@@ -17,6 +19,11 @@ class FranceTravailFetcher(BaseFetcher):
     """
 
     SOURCE_NAME = "francetravail"
+    PAGE_SIZE = 150  # Max 150 par requête
+    MAX_PAGES = 21   # L'API refuse un range au-delà de 3149
+    PAGE_WORKERS = 3
+    QUERY_PARAM = 'keywords'
+    SCOPE_PARAMS = {'departement': None, 'region': None, 'typeContrat': None}
     TOKEN_URL = "https://entreprise.francetravail.fr/connexion/oauth2/access_token"
     API_URL = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search"
 
@@ -28,24 +35,35 @@ class FranceTravailFetcher(BaseFetcher):
         'développeur Python', 'développeur backend'
     ]
 
-    def __init__(self, client_id: str = None, client_secret: str = None):
+    def __init__(self, client_id: str = None, client_secret: str = None, token_cache_path: str = None):
+        """
+        Args:
+            client_id / client_secret: Identifiants francetravail.io
+            token_cache_path: Fichier partagé entre workers pour le token OAuth2
+                              (None: cache en mémoire du processus)
+        """
         self.client_id = client_id
         self.client_secret = client_secret
-        self._access_token = None
-        self._token_expires = None
+        self.token_cache = get_token_cache(token_cache_path)
 
     def is_configured(self) -> bool:
         return bool(self.client_id and self.client_secret)
 
-    def _get_access_token(self) -> Optional[str]:
-        """Obtenir un token OAuth2"""
+    def default_queries(self) -> List[str]:
+        return list(self.SEARCH_KEYWORDS)
+
+    def _get_access_token(self, timeout: float = 30) -> Optional[str]:
+        """Obtenir un token OAuth2 (partagé entre threads et workers, voir TokenCache)"""
         if not self.is_configured():
             return None
 
-        if self._access_token and self._token_expires:
-            if datetime.now() < self._token_expires:
-                return self._access_token
+        return self.token_cache.get(self._token_key(), lambda: self._request_token(timeout))
 
+    def _token_key(self) -> str:
+        return f'{self.SOURCE_NAME}:{self.client_id}'
+
+    def _request_token(self, timeout: float) -> Tuple[str, int]:
+        """Demander un nouveau token: (access_token, durée de validité en secondes)"""
         params = {'realm': '/partenaire'}
 
         data = {
@@ -62,17 +80,12 @@ class FranceTravailFetcher(BaseFetcher):
             params=params,
             data=data,
             headers=headers,
-            timeout=30
+            timeout=timeout
         )
         response.raise_for_status()
 
         token_data = response.json()
-        self._access_token = token_data.get('access_token')
-
-        expires_in = token_data.get('expires_in', 1500)
-        self._token_expires = datetime.now() + timedelta(seconds=expires_in - 60)
-
-        return self._access_token
+        return token_data.get('access_token'), int(token_data.get('expires_in', 1500))
 
     def fetch_jobs(
         self,
@@ -80,26 +93,39 @@ class FranceTravailFetcher(BaseFetcher):
         departement: str = None,
         region: str = None,
         typeContrat: str = None,
+        since: Dict[str, datetime] = None,
+        watermarks: Dict[str, datetime] = None,
+        budget: FetchBudget = None,
+        query_stats: Dict[str, Dict] = None,
         **kwargs
     ) -> List[JobData]:
         """
         Rechercher des offres d'emploi avec multi-mots-clés
 
+        Toutes les pages sont parcourues (les plus récentes d'abord), jusqu'à
+        une page dont toutes les offres sont plus anciennes que since[mot-clé].
+
         Args:
             keywords: Liste de mots-clés (défaut: SEARCH_KEYWORDS)
             departement: Code département (ex: "75" pour Paris)
             region: Code région
             typeContrat: CDI, CDD, MIS, etc.
+            since: Date de la dernière offre déjà récupérée, par mot-clé
+            watermarks: Rempli avec la nouvelle date par mot-clé entièrement parcouru
+            budget: Limites de temps / nombre d'offres, erreurs par mot-clé
+            query_stats: Rempli avec les appels et identifiants par mot-clé
         """
         if not self.is_configured():
             return []
 
-        token = self._get_access_token()
+        budget = budget or FetchBudget()
+        token = self._get_access_token(timeout=budget.timeout())
         if not token:
             return []
 
         if keywords is None:
             keywords = self.SEARCH_KEYWORDS
+        since = since or {}
 
         headers = {
             'Authorization': f'Bearer {token}',
@@ -109,41 +135,64 @@ class FranceTravailFetcher(BaseFetcher):
         all_jobs = {}
 
         for keyword in keywords:
-            try:
-                params = {
-                    'range': '0-149',  # Max 150 par requête
-                    'motsCles': keyword
-                }
-
-                if departement:
-                    params['departement'] = departement
-                if region:
-                    params['region'] = region
-                if typeContrat:
-                    params['typeContrat'] = typeContrat
-
-                response = requests.get(
-                    self.API_URL,
-                    headers=headers,
-                    params=params,
-                    timeout=30
-                )
-
-                if response.status_code != 200:
-                    continue
-
-                data = response.json()
-                jobs = data.get('resultats', [])
-
-                for job in jobs:
-                    job_id = job.get('id', '')
-                    if job_id and job_id not in all_jobs:
-                        all_jobs[job_id] = job
-
-            except Exception:
-                continue
-
-        return [self.normalize_job(job) for job in all_jobs.values()]
+            if budget.stop(len(all_jobs)):
+                break
+
+            params = {
+                'motsCles': keyword,
+                'sort': 1  # Date de création décroissante
+            }
+
+            if departement:
+                params['departement'] = departement
+            if region:
+                params['region'] = region
+            if typeContrat:
+                params['typeContrat'] = typeContrat
+
+            jobs, complete = self._walk_pages(
+                lambda page, params=params: self._search_page(headers, params, page, budget.timeout()),
+                since=since.get(keyword),
+                budget=budget,
+                context=keyword,
+                query_stats=query_stats
+            )
+            if complete:
+                self._record_watermark(watermarks, keyword, jobs, since.get(keyword))
+
+            for job in jobs:
+                if job.external_id and job.external_id not in all_jobs:
+                    all_jobs[job.external_id] = job
+
+        return list(all_jobs.values())
+
+    def _search_page(
+        self, headers: Dict, params: Dict, page: int, timeout: float = 30
+    ) -> Tuple[List[JobData], Optional[int]]:
+        """Une page de résultats et le nombre total de pages (en-tête Content-Range)"""
+        start = page * self.PAGE_SIZE
+        response = requests.get(
+            self.API_URL,
+            headers=headers,
+            params={**params, 'range': f'{start}-{start + self.PAGE_SIZE - 1}'},
+            timeout=timeout
+        )
+
+        # 204: aucun résultat, 206: résultats partiels (d'autres pages suivent)
+        if response.status_code == 204:
+            return [], 0
+        if response.status_code == 401:
+            # Token révoqué: le prochain appel en demandera un nouveau
+            self.token_cache.invalidate(self._token_key())
+        response.raise_for_status()
+
+        total_pages = None
+        match = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+        if match:
+            total_pages = -(-int(match.group(1)) // self.PAGE_SIZE)
+
+        jobs = response.json().get('resultats', [])
+        return [self.normalize_job(job) for job in jobs], total_pages
 
     def normalize_job(self, raw_job: Dict) -> JobData:
         # Type de contrat
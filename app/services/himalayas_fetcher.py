@@ -1,7 +1,8 @@
 import requests
 from datetime import datetime
 from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
+from .urls import url_fingerprint
 
 
 class HimalayasFetcher(BaseFetcher):
@@ -14,7 +15,8 @@ class HimalayasFetcher(BaseFetcher):
     SOURCE_NAME = "himalayas"
     API_URL = "https://himalayas.app/jobs/api"
 
-    def fetch_jobs(self, limit: int = 500, **kwargs) -> List[JobData]:
+    def fetch_jobs(self, limit: int = 500, budget: FetchBudget = None, **kwargs) -> List[JobData]:
+        budget = budget or FetchBudget()
         headers = {
             'User-Agent': 'FreelanceJobFetcher/1.0'
         }
@@ -27,7 +29,7 @@ class HimalayasFetcher(BaseFetcher):
             self.API_URL,
             headers=headers,
             params=params,
-            timeout=60
+            timeout=budget.timeout(60)
         )
         response.raise_for_status()
 
@@ -68,11 +70,11 @@ class HimalayasFetcher(BaseFetcher):
             except:
                 pass
 
-        # External ID from guid
-        external_id = raw_job.get('guid', '') or raw_job.get('applicationLink', '')
+        # External ID from guid (a URL): its fingerprint is the same in every process
+        external_id = url_fingerprint(raw_job.get('guid') or raw_job.get('applicationLink'))
 
         return JobData(
-            external_id=str(hash(external_id)),
+            external_id=external_id or '',
             title=raw_job.get('title', ''),
             company=raw_job.get('companyName', 'Unknown'),
             description=raw_job.get('excerpt', '') or raw_job.get('description', ''),
@@ -80,6 +82,7 @@ class HimalayasFetcher(BaseFetcher):
             job_type='remote',
             salary_min=int(salary_min) if salary_min else None,
             salary_max=int(salary_max) if salary_max else None,
+            salary_currency=currency if salary_min or salary_max else None,
             salary_text=salary_text,
             url=raw_job.get('applicationLink') or raw_job.get('guid', ''),
             company_logo=raw_job.get('companyLogo', ''),
@@ -0,0 +1,31 @@
+import re
+from html import unescape
+
+
+# Blocs dont le contenu n'est pas du texte visible
+_INVISIBLE_RE = re.compile(r'<(script|style|head)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+# Balises réelles seulement : un « < » isolé (« salaire < 50k ») reste du texte
+_TAG_RE = re.compile(r'<[A-Za-z/!?][^>]*>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def html_to_text(html: str) -> str:
+    """
+    Convertit une description HTML en texte brut normalisé pour l'analyse.
+
+    Supprime balises, commentaires, scripts et styles, décode les entités,
+    compacte les espaces et passe en minuscules.
+    """
+    if not html:
+        return ''
+
+    text = html
+    if '<' in text:
+        text = _COMMENT_RE.sub(' ', text)
+        text = _INVISIBLE_RE.sub(' ', text)
+        text = _TAG_RE.sub(' ', text)
+    if '&' in text:
+        text = unescape(text)
+
+    return _WHITESPACE_RE.sub(' ', text).strip().lower()
@@ -0,0 +1,346 @@
+import io
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from flask import current_app
+from app import db
+from app.models import Job, FetchLog, FetchWatermark
+from app.services.base_fetcher import JobData
+from app.services.urls import url_fingerprint
+
+
+# Keeps the IN (...) list under SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Job columns written by the PostgreSQL COPY path. Python-side defaults
+# (is_manual, created_at...) are not applied by COPY, so they are listed too.
+COPY_COLUMNS = (
+    'external_id', 'title', 'company', 'location', 'job_type',
+    'salary_min', 'salary_max', 'salary_currency', 'salary_text',
+    'salary_period', 'salary_annual_currency', 'salary_annual_min', 'salary_annual_max',
+    'url', 'url_fingerprint', 'company_logo', 'source', 'source_category',
+    'is_manual', 'is_bookmarked', 'is_applied',
+    'posted_at', 'fetched_at', 'created_at', 'updated_at',
+)
+
+_COPY_NULL = r'\N'
+
+
+def existing_external_ids(source_name: str, external_ids: Iterable[str]) -> Set[str]:
+    """External ids of `source_name` already in the database"""
+    ids = list(dict.fromkeys(external_ids))
+    found = set()
+    for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+        batch = ids[start:start + LOOKUP_BATCH_SIZE]
+        rows = db.session.query(Job.external_id).filter(
+            Job.source == source_name,
+            Job.external_id.in_(batch)
+        )
+        found.update(external_id for (external_id,) in rows)
+    return found
+
+
+def load_watermarks(sources: Iterable[str] = None) -> Dict[str, Dict[str, Dict[str, datetime]]]:
+    """High-water marks as {source: {scope: {keyword: posted_at}}}, for JobAggregator.fetch_all"""
+    query = FetchWatermark.query
+    if sources is not None:
+        query = query.filter(FetchWatermark.source.in_(list(sources)))
+
+    watermarks = {}
+    for mark in query:
+        watermarks.setdefault(mark.source, {}).setdefault(mark.scope, {})[mark.keyword] = mark.posted_at
+    return watermarks
+
+
+def open_circuits(
+    sources: Iterable[str],
+    threshold: int = None,
+    cooldown: int = None
+) -> Dict[str, datetime]:
+    """
+    Circuit breaker over the fetch history.
+
+    A source whose last `threshold` fetches (skipped ones aside) all failed
+    is skipped until `cooldown` seconds after its latest failure; the next
+    attempt then closes the circuit again or reopens it. Returns
+    {source: retry time (UTC)} for the sources to skip, for fetch_all.
+    """
+    if threshold is None:
+        threshold = current_app.config.get('CIRCUIT_BREAKER_THRESHOLD', 3)
+    if cooldown is None:
+        cooldown = current_app.config.get('CIRCUIT_BREAKER_COOLDOWN', 1800)
+    if threshold <= 0:
+        return {}
+
+    now = datetime.utcnow()
+    circuits = {}
+    for source_name in sources:
+        logs = FetchLog.query.filter(
+            FetchLog.source == source_name,
+            FetchLog.status != 'skipped'
+        ).order_by(FetchLog.fetched_at.desc(), FetchLog.id.desc()).limit(threshold).all()
+
+        if len(logs) < threshold or any(log.status != 'error' for log in logs):
+            continue
+        retry_at = logs[0].fetched_at + timedelta(seconds=cooldown)
+        if retry_at > now:
+            circuits[source_name] = retry_at
+    return circuits
+
+
+def save_watermarks(source_name: str, watermarks: Dict[str, datetime], scope: str = ''):
+    """Move the source's high-water marks in `scope` forward (never back). The caller commits."""
+    if not watermarks:
+        return
+
+    existing = {
+        mark.keyword: mark
+        for mark in FetchWatermark.query.filter_by(source=source_name, scope=scope)
+    }
+    for keyword, posted_at in watermarks.items():
+        mark = existing.get(keyword)
+        if mark is None:
+            db.session.add(FetchWatermark(source=source_name, scope=scope, keyword=keyword, posted_at=posted_at))
+        elif posted_at > mark.posted_at:
+            mark.posted_at = posted_at
+
+
+def ingest_key(job_data: JobData) -> Optional[str]:
+    """
+    External id a fetched job is stored under: the source's own id, else
+    the fingerprint of its URL. None when it has neither: such a job could
+    not be told apart from the next one and is not stored.
+    """
+    return job_data.external_id or url_fingerprint(job_data.url)
+
+
+def job_from_data(source_name: str, job_data: JobData, fetched_at: datetime = None) -> Job:
+    """Build a (salary-normalized) Job from a fetcher result"""
+    job = Job(
+        external_id=job_data.external_id,
+        title=job_data.title,
+        company=job_data.company,
+        description=job_data.description,
+        location=job_data.location,
+        job_type=job_data.job_type,
+        salary_min=job_data.salary_min,
+        salary_max=job_data.salary_max,
+        salary_currency=job_data.salary_currency,
+        salary_text=job_data.salary_text,
+        url=job_data.url,
+        company_logo=job_data.company_logo,
+        source=source_name,
+        source_category=job_data.source_category,
+        posted_at=job_data.posted_at,
+        fetched_at=fetched_at or datetime.utcnow()
+    )
+    job.normalize_salary()
+    return job
+
+
+def _copy_value(value) -> str:
+    """One CSV field for COPY ... (FORMAT csv, NULL '\\N')"""
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    elif isinstance(value, bytes):
+        value = '\\x' + value.hex()
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    # Quoted fields are never read as NULL, even if they contain \N
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _copy_rows(jobs: List[Job]) -> io.StringIO:
+    buffer = io.StringIO()
+    for job in jobs:
+        description = job.description_row
+        values = [getattr(job, column) for column in COPY_COLUMNS]
+        values.append(description.body if description is not None else None)
+        values.append(description.text if description is not None else None)
+        buffer.write(','.join(_copy_value(value) for value in values))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def copy_jobs(jobs: List[Job]) -> List[Job]:
+    """
+    Insert transient jobs with COPY (PostgreSQL only).
+
+    Rows are streamed into a temporary staging table (dropped on commit),
+    then moved to `jobs` with INSERT ... ON CONFLICT ON CONSTRAINT
+    uq_source_external_id DO NOTHING; descriptions follow with a join on
+    the new ids. Runs in the session transaction, the caller commits.
+
+    Every job needs an external_id (see ingest_key): ON CONFLICT never
+    matches a NULL, and the descriptions and ids are mapped back on
+    (source, external_id).
+
+    Returns the jobs that were actually inserted (not already stored).
+    """
+    from app.caching import mark_data_changed
+
+    if not jobs:
+        return []
+    if any(not job.external_id for job in jobs):
+        raise ValueError('copy_jobs: every job needs an external_id')
+
+    for job in jobs:
+        job.is_manual = bool(job.is_manual)
+        job.is_bookmarked = bool(job.is_bookmarked)
+        job.is_applied = bool(job.is_applied)
+        job.created_at = job.created_at or job.fetched_at or datetime.utcnow()
+        job.updated_at = job.updated_at or job.created_at
+
+    columns = ', '.join(COPY_COLUMNS)
+    connection = db.session.connection()
+
+    # Column types only: no constraints and no id sequence default
+    connection.exec_driver_sql(
+        'CREATE TEMP TABLE jobs_staging ON COMMIT DROP AS '
+        f'SELECT {columns}, NULL::bytea AS description_body, NULL::text AS description_text '
+        'FROM jobs WITH NO DATA'
+    )
+
+    copy_sql = (
+        f'COPY jobs_staging ({columns}, description_body, description_text) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+    )
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        rows = _copy_rows(jobs)
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            cursor.copy_expert(copy_sql, rows)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(rows.getvalue())
+    finally:
+        cursor.close()
+
+    inserted = connection.exec_driver_sql(
+        f'INSERT INTO jobs ({columns}) '
+        f'SELECT {columns} FROM jobs_staging '
+        'ON CONFLICT ON CONSTRAINT uq_source_external_id DO NOTHING '
+        'RETURNING id, source, external_id'
+    ).all()
+    if not inserted:
+        return []
+
+    connection.exec_driver_sql(
+        'INSERT INTO job_descriptions (job_id, body, text) '
+        'SELECT j.id, s.description_body, s.description_text '
+        'FROM jobs_staging s JOIN jobs j '
+        'ON j.source = s.source AND j.external_id = s.external_id '
+        'WHERE j.id = ANY(%(ids)s) AND s.description_body IS NOT NULL',
+        {'ids': [job_id for job_id, _, _ in inserted]}
+    )
+    mark_data_changed(db.session)
+
+    ids = {(source, external_id): job_id for job_id, source, external_id in inserted}
+    created = []
+    for job in jobs:
+        job_id = ids.get((job.source, job.external_id))
+        if job_id is not None:
+            job.id = job_id
+            created.append(job)
+    return created
+
+
+def save_fetch_results(results: Dict[str, Dict], batch_size: int = None) -> Dict[str, int]:
+    """
+    Persist the output of JobAggregator.fetch_all.
+
+    Logs every source in FetchLog and inserts the jobs that are not already
+    stored, dropping duplicates inside a batch. Jobs are keyed on
+    ingest_key (source id, else URL fingerprint); jobs with neither are
+    skipped. New jobs and their rollups are committed every `batch_size`
+    jobs (INGEST_BATCH_SIZE) so that the write lock is never held for a
+    whole fetch.
+
+    Existing ids are looked up in batches and the ORM inserts the rest;
+    on PostgreSQL with POSTGRES_COPY_INGEST, copy_jobs inserts them
+    instead and also drops the ones stored concurrently in the meantime.
+
+    New jobs are matched against the saved searches in the same batch
+    (see saved_searches.Percolator).
+
+    High-water marks and per-query statistics reported by the fetchers
+    are saved with the last batch, once all of the source's jobs are stored,
+    for the sources that succeeded (fully or partially) only.
+
+    Returns the number of new jobs per source.
+    """
+    from app.services.query_planner import record_query_stats
+    from app.services.rollups import update_rollups
+    from app.services.saved_searches import load_percolator, match_new_jobs
+
+    if batch_size is None:
+        batch_size = current_app.config.get('INGEST_BATCH_SIZE', 500)
+    use_copy = (
+        db.engine.dialect.name == 'postgresql'
+        and current_app.config.get('POSTGRES_COPY_INGEST', False)
+    )
+
+    fetched_at = datetime.utcnow()
+    percolator = load_percolator()
+    pending: List[Job] = []
+    new_counts = {}
+
+    def flush():
+        if use_copy:
+            created = copy_jobs(pending)
+        else:
+            db.session.add_all(pending)
+            created = list(pending)
+        for job in created:
+            new_counts[job.source] += 1
+        update_rollups(created)
+        if percolator is not None:
+            match_new_jobs(created, percolator)
+        db.session.commit()
+        pending.clear()
+
+    for source_name, result in results.items():
+        db.session.add(FetchLog(
+            source=source_name,
+            status=result['status'],
+            jobs_fetched=result['count'],
+            error_message=result.get('error')
+        ))
+
+        new_counts[source_name] = 0
+        if result['status'] not in ('success', 'partial'):
+            continue
+
+        keys = [ingest_key(job_data) for job_data in result['jobs']]
+        seen = existing_external_ids(source_name, (key for key in keys if key))
+
+        unkeyed = 0
+        for job_data, key in zip(result['jobs'], keys):
+            if not key:
+                unkeyed += 1
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            job = job_from_data(source_name, job_data, fetched_at)
+            job.external_id = key
+            pending.append(job)
+            if len(pending) >= batch_size:
+                flush()
+        if unkeyed:
+            current_app.logger.warning('%s: %d jobs without id nor URL skipped', source_name, unkeyed)
+
+    for source_name, result in results.items():
+        # A failed or skipped fetch is not a run: it would drag every yield down
+        if result['status'] in ('success', 'partial'):
+            save_watermarks(source_name, result.get('watermarks'), result.get('watermark_scope', ''))
+            record_query_stats(source_name, result.get('queries'), fetched_at)
+    flush()
+
+    return new_counts
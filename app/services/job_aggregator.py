@@ -1,52 +1,96 @@
-from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
-from .remoteok_fetcher import RemoteOKFetcher
-from .remotive_fetcher import RemotiveFetcher
-from .arbeitnow_fetcher import ArbeitnowFetcher
-from .himalayas_fetcher import HimalayasFetcher
-from .adzuna_fetcher import AdzunaFetcher
-from .francetravail_fetcher import FranceTravailFetcher
-from .careerjet_fetcher import CareerjetFetcher
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from datetime import datetime
+from typing import Callable, List, Dict, Optional
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
+
+
+# Source name -> (fetcher import path, {constructor kwarg: config key}).
+# Modules (and `requests`) are only imported when a fetcher is first used.
+# Sources with credentials are only registered when all their keys are set;
+# OPTIONAL_SETTINGS are passed when present but do not gate the source.
+FETCHER_REGISTRY = {
+    # International sources (no auth required)
+    'remoteok': ('app.services.remoteok_fetcher:RemoteOKFetcher', {}),
+    'remotive': ('app.services.remotive_fetcher:RemotiveFetcher', {}),
+    'arbeitnow': ('app.services.arbeitnow_fetcher:ArbeitnowFetcher', {}),
+    'himalayas': ('app.services.himalayas_fetcher:HimalayasFetcher', {}),
+
+    # France Travail (ex-Pôle Emploi) - needs OAuth2 credentials
+    'francetravail': ('app.services.francetravail_fetcher:FranceTravailFetcher', {
+        'client_id': 'FRANCETRAVAIL_CLIENT_ID',
+        'client_secret': 'FRANCETRAVAIL_CLIENT_SECRET',
+    }),
+
+    # Careerjet - needs affiliate ID
+    'careerjet': ('app.services.careerjet_fetcher:CareerjetFetcher', {
+        'affid': 'CAREERJET_AFFID',
+    }),
+
+    # Adzuna - needs app_id and api_key
+    'adzuna': ('app.services.adzuna_fetcher:AdzunaFetcher', {
+        'app_id': 'ADZUNA_APP_ID',
+        'api_key': 'ADZUNA_API_KEY',
+    }),
+}
+
+
+OPTIONAL_SETTINGS = {
+    # Token file shared by all workers
+    'francetravail': {'token_cache_path': 'OAUTH_TOKEN_CACHE'},
+}
+
+
+def get_aggregator(app) -> 'JobAggregator':
+    """The app's JobAggregator, built once per process"""
+    aggregator = app.extensions.get('job_aggregator')
+    if aggregator is None:
+        aggregator = app.extensions.setdefault('job_aggregator', JobAggregator(app.config))
+    return aggregator
 
 
 class JobAggregator:
     """Coordinates fetching from multiple sources"""
 
+    # Seconds granted after the global deadline for source budgets to wind down
+    DEADLINE_GRACE = 5
+
     def __init__(self, config: Dict = None):
         self.config = config or {}
-        self.fetchers: List[BaseFetcher] = []
-        self._initialize_fetchers()
-
-    def _initialize_fetchers(self):
-        """Initialize all available fetchers"""
-        # International sources (no auth required)
-        self.fetchers.append(RemoteOKFetcher())
-        self.fetchers.append(RemotiveFetcher())
-        self.fetchers.append(ArbeitnowFetcher())
-        self.fetchers.append(HimalayasFetcher())
-
-        # France Travail (ex-Pôle Emploi) - needs OAuth2 credentials
-        ft_client_id = self.config.get('FRANCETRAVAIL_CLIENT_ID')
-        ft_client_secret = self.config.get('FRANCETRAVAIL_CLIENT_SECRET')
-        if ft_client_id and ft_client_secret:
-            self.fetchers.append(FranceTravailFetcher(
-                client_id=ft_client_id,
-                client_secret=ft_client_secret
-            ))
-
-        # Careerjet - needs affiliate ID
-        careerjet_affid = self.config.get('CAREERJET_AFFID')
-        if careerjet_affid:
-            self.fetchers.append(CareerjetFetcher(affid=careerjet_affid))
-
-        # Adzuna - needs app_id and api_key
-        adzuna_app_id = self.config.get('ADZUNA_APP_ID')
-        adzuna_api_key = self.config.get('ADZUNA_API_KEY')
-        if adzuna_app_id and adzuna_api_key:
-            self.fetchers.append(AdzunaFetcher(
-                app_id=adzuna_app_id,
-                api_key=adzuna_api_key
-            ))
+        self._fetchers: Dict[str, BaseFetcher] = {}
+        self._lock = threading.Lock()
+
+        # Enabled sources, in registry order; nothing is imported yet
+        self.source_names: List[str] = [
+            name for name, (_, settings) in FETCHER_REGISTRY.items()
+            if all(self.config.get(key) for key in settings.values())
+        ]
+
+    def get_fetcher(self, source_name: str) -> Optional[BaseFetcher]:
+        """Import and instantiate a fetcher on first use"""
+        if source_name not in self.source_names:
+            return None
+
+        with self._lock:
+            fetcher = self._fetchers.get(source_name)
+            if fetcher is None:
+                path, settings = FETCHER_REGISTRY[source_name]
+                module_name, class_name = path.split(':')
+                fetcher_class = getattr(importlib.import_module(module_name), class_name)
+                kwargs = {kwarg: self.config.get(key) for kwarg, key in settings.items()}
+                for kwarg, key in OPTIONAL_SETTINGS.get(source_name, {}).items():
+                    if self.config.get(key):
+                        kwargs[kwarg] = self.config.get(key)
+                fetcher = fetcher_class(**kwargs)
+                self._fetchers[source_name] = fetcher
+            return fetcher
+
+    @property
+    def fetchers(self) -> List[BaseFetcher]:
+        """All enabled fetchers (imports every fetcher module)"""
+        return [self.get_fetcher(name) for name in self.source_names]
 
     def _needs_config(self, fetcher: BaseFetcher) -> bool:
         """Check if a fetcher needs configuration"""
@@ -54,105 +98,203 @@ class JobAggregator:
             return not fetcher.is_configured()
         return False
 
-    def fetch_all(self, sources: List[str] = None) -> Dict[str, Dict]:
+    def fetch_all(
+        self,
+        sources: List[str] = None,
+        workers: int = 1,
+        on_result: Callable[[str, Dict], None] = None,
+        since: Dict[str, Dict[str, datetime]] = None,
+        open_circuits: Dict[str, datetime] = None,
+        queries: Dict[str, List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Dict]:
         """
         Fetch from all or specified sources
 
+        The whole run is bounded by FETCH_DEADLINE seconds and each source
+        by FETCH_SOURCE_BUDGET seconds and MAX_JOBS_PER_SOURCE jobs; a
+        source that runs out of budget returns what it has ('partial').
+
         Args:
             sources: Optional list of source names to fetch from.
                     If None, fetches from all sources.
+            workers: Number of sources fetched concurrently (threads).
+            on_result: Called with (source_name, result) as each source finishes.
+            since: High-water marks per source and scope,
+                    {source: {scope: {keyword: posted_at}}} (see
+                    BaseFetcher.watermark_scope); paginated sources stop at
+                    pages older than the mark of their scope.
+            open_circuits: Sources to skip, with the time they may be retried
+                    (see ingest.open_circuits).
+            queries: Planned queries per source (see query_planner); ignored
+                    when the caller passes the source's query argument itself.
+            **kwargs: Search parameters passed to every fetcher
+                    (keywords, country, departement...).
 
         Returns:
-            Dict with source names as keys, containing:
-            - status: 'success' or 'error'
+            Dict with source names as keys (in registry order), containing:
+            - status: 'success', 'partial', 'skipped' or 'error'
             - jobs: List of JobData objects
             - count: Number of jobs fetched
-            - error: Error message if status is 'error'
+            - duration: Seconds spent on the source
+            - watermarks: New high-water marks, {keyword: posted_at}
+            - watermark_scope: Scope of those marks ('' = default search)
+            - queries: Requests and ids per query, {query: {calls, ids}}
+            - error: Error message if status is not 'success'
         """
+        names = [
+            name for name in self.source_names
+            if not sources or name in sources
+        ]
+
+        since = since or {}
+        open_circuits = open_circuits or {}
+        queries = queries or {}
+        deadline = self.config.get('FETCH_DEADLINE')
+        deadline = time.monotonic() + deadline if deadline else None
         results = {}
 
-        for fetcher in self.fetchers:
-            source_name = fetcher.SOURCE_NAME
+        def finish(source_name, result):
+            results[source_name] = result
+            if on_result is not None:
+                on_result(source_name, result)
 
-            # Skip if specific sources requested and this isn't one of them
-            if sources and source_name not in sources:
-                continue
+        def run(source_name):
+            if deadline is not None and time.monotonic() >= deadline:
+                return self._empty_result('skipped', 'Délai global dépassé')
+            return self.fetch_source(
+                source_name,
+                since=since.get(source_name),
+                budget=self._source_budget(deadline),
+                queries=queries.get(source_name),
+                **kwargs
+            )
 
-            # Skip if not configured
-            if self._needs_config(fetcher):
-                results[source_name] = {
-                    'status': 'skipped',
-                    'jobs': [],
-                    'count': 0,
-                    'error': 'Non configuré - clés API manquantes'
-                }
-                continue
+        to_fetch = []
+        for source_name in names:
+            retry_at = open_circuits.get(source_name)
+            if retry_at is not None:
+                finish(source_name, self._empty_result(
+                    'skipped', f"Trop d'échecs, nouvel essai après {retry_at:%H:%M} UTC"
+                ))
+            else:
+                to_fetch.append(source_name)
 
+        if workers <= 1 or len(to_fetch) <= 1:
+            for source_name in to_fetch:
+                finish(source_name, run(source_name))
+        else:
+            executor = ThreadPoolExecutor(max_workers=min(workers, len(to_fetch)))
+            futures = {executor.submit(run, source_name): source_name for source_name in to_fetch}
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0) + self.DEADLINE_GRACE
             try:
-                jobs = fetcher.fetch_jobs()
-                results[source_name] = {
-                    'status': 'success',
-                    'jobs': jobs,
-                    'count': len(jobs)
-                }
-            except Exception as e:
-                results[source_name] = {
-                    'status': 'error',
-                    'jobs': [],
-                    'count': 0,
-                    'error': str(e)
-                }
-
-        return results
-
-    def fetch_source(self, source_name: str, **kwargs) -> Dict:
-        """Fetch from a specific source"""
-        for fetcher in self.fetchers:
-            if fetcher.SOURCE_NAME == source_name:
-                if self._needs_config(fetcher):
-                    return {
-                        'status': 'error',
-                        'jobs': [],
-                        'count': 0,
-                        'error': 'Non configuré - clés API manquantes'
-                    }
-
-                try:
-                    jobs = fetcher.fetch_jobs(**kwargs)
-                    return {
-                        'status': 'success',
-                        'jobs': jobs,
-                        'count': len(jobs)
-                    }
-                except Exception as e:
-                    return {
-                        'status': 'error',
-                        'jobs': [],
-                        'count': 0,
-                        'error': str(e)
-                    }
+                for future in as_completed(futures, timeout=timeout):
+                    finish(futures[future], future.result())
+            except TimeoutError:
+                # Sources stuck past the deadline are abandoned, their
+                # threads end on their own HTTP timeouts
+                for future, source_name in futures.items():
+                    if source_name not in results:
+                        finish(source_name, self._empty_result('error', 'Délai global dépassé'))
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return {name: results[name] for name in names}
+
+    def _source_budget(self, deadline: Optional[float]) -> FetchBudget:
+        """Budget of a source starting now: its own limit, capped by the global deadline"""
+        seconds = self.config.get('FETCH_SOURCE_BUDGET') or None
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.001)
+            seconds = min(seconds, remaining) if seconds else remaining
+        return FetchBudget(seconds=seconds, max_jobs=self.config.get('MAX_JOBS_PER_SOURCE'))
 
+    @staticmethod
+    def _empty_result(status: str, error: str) -> Dict:
         return {
-            'status': 'error',
+            'status': status,
             'jobs': [],
             'count': 0,
-            'error': f'Source inconnue: {source_name}'
+            'duration': 0.0,
+            'error': error
         }
 
+    def fetch_source(
+        self,
+        source_name: str,
+        since: Dict[str, Dict[str, datetime]] = None,
+        budget: FetchBudget = None,
+        queries: List[str] = None,
+        **kwargs
+    ) -> Dict:
+        """Fetch from a specific source (`since`: {scope: {keyword: posted_at}})"""
+        fetcher = self.get_fetcher(source_name)
+        if fetcher is None:
+            return self._empty_result('error', f'Source inconnue: {source_name}')
+
+        if self._needs_config(fetcher):
+            return self._empty_result('skipped', 'Non configuré - clés API manquantes')
+
+        if budget is None:
+            budget = self._source_budget(None)
+
+        if queries is not None and fetcher.QUERY_PARAM and fetcher.QUERY_PARAM not in kwargs:
+            kwargs[fetcher.QUERY_PARAM] = queries
+
+        scope = fetcher.watermark_scope(**kwargs)
+        started = time.perf_counter()
+        watermarks = {}
+        query_stats = {}
+        try:
+            jobs = fetcher.fetch_jobs(
+                since=(since or {}).get(scope, {}), watermarks=watermarks, budget=budget, query_stats=query_stats, **kwargs
+            )
+        except Exception as e:
+            budget.record_error('', e)
+            jobs = []
+        duration = time.perf_counter() - started
+
+        if budget.max_jobs is not None and len(jobs) > budget.max_jobs:
+            jobs = jobs[:budget.max_jobs]
+            budget.exhausted = budget.exhausted or 'max_jobs'
+            # Dropped jobs must be fetched again next time
+            watermarks = {}
+
+        result = {
+            'status': 'success',
+            'jobs': jobs,
+            'count': len(jobs),
+            'duration': duration,
+            'watermarks': watermarks,
+            'watermark_scope': scope,
+            'queries': query_stats
+        }
+
+        problems = list(budget.errors)
+        if budget.exhausted == 'time':
+            problems.append('Budget de temps épuisé')
+        elif budget.exhausted == 'max_jobs':
+            problems.append(f'Limite de {budget.max_jobs} offres atteinte')
+
+        if budget.errors and not jobs:
+            result['status'] = 'error'
+        elif problems:
+            result['status'] = 'partial'
+        if problems:
+            result['error'] = '; '.join(problems[:5])
+
+        return result
+
     def get_available_sources(self) -> List[str]:
         """Get list of available source names"""
-        sources = []
-        for fetcher in self.fetchers:
-            if not self._needs_config(fetcher):
-                sources.append(fetcher.SOURCE_NAME)
-        return sources
+        return list(self.source_names)
 
     def get_all_sources(self) -> List[Dict]:
         """Get all sources with their configuration status"""
         return [
             {
-                'name': f.SOURCE_NAME,
-                'configured': not self._needs_config(f)
+                'name': name,
+                'configured': name in self.source_names
             }
-            for f in self.fetchers
+            for name in FETCHER_REGISTRY
         ]
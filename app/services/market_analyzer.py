@@ -1,7 +1,11 @@
+import itertools
 import re
-from collections import Counter
-from typing import Dict, List, Tuple, Optional
-from app.models import Job
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+import numpy as np
+from app import db
+from app.models import Job, JobDescription
 
 
 # Technologies à détecter (insensible à la casse)
@@ -72,239 +76,561 @@ DIPLOMAS = {
 }
 
 
-class MarketAnalyzer:
-    """Analyse le marché à partir des offres d'emploi"""
+# Une ligne = les seules colonnes lues par l'analyse, en tuple picklable.
+# `description` est le texte brut normalisé (JobDescription.text), pas le HTML.
+JobRow = namedtuple('JobRow', [
+    'title', 'description', 'source_category',
+    'salary_text', 'salary_min', 'salary_max', 'salary_currency',
+    'job_type', 'source',
+    'salary_period', 'salary_annual_currency', 'salary_annual_min', 'salary_annual_max',
+], defaults=(None, None, None, None))
 
-    def __init__(self, jobs: List[Job] = None):
-        self.jobs = jobs or []
+SALARY_TYPES = ('hourly', 'daily', 'monthly', 'yearly')
 
-    def set_jobs(self, jobs: List[Job]):
-        self.jobs = jobs
+# Conversion en annuel : 1600h/an et 218 jours/an pour un freelance
+YEARLY_FACTORS = np.array([1600, 218, 12, 1], dtype=np.float64)
 
-    def analyze_technologies(self, limit: int = 20) -> List[Tuple[str, int]]:
-        """Compte les technologies mentionnées dans les offres"""
-        tech_counter = Counter()
+SALARY_PERCENTILES = (10, 25, 50, 75, 90)
+SALARY_HISTOGRAM_BINS = 20
 
-        for job in self.jobs:
-            text = f"{job.title} {job.description or ''} {job.source_category or ''}"
-            text_lower = text.lower()
+# Devise des chiffres de synthèse (moyenne, médiane, percentiles, histogramme) :
+# on ne mélange pas les devises, les autres ne figurent que dans by_currency
+HEADLINE_CURRENCY = 'EUR'
+
+# Devise par défaut des sources qui ne la précisent pas
+SOURCE_CURRENCIES = {
+    'remoteok': 'USD',
+    'himalayas': 'USD',
+}
+
+TECH_NORMALIZATIONS = {
+    'vue.js': 'Vue.js',
+    'vue': 'Vue.js',
+    'node.js': 'Node.js',
+    'react native': 'React Native',
+    'ruby on rails': 'Rails',
+    'rails': 'Rails',
+    'k8s': 'Kubernetes',
+    'gcp': 'Google Cloud',
+    'google cloud': 'Google Cloud',
+    'spring boot': 'Spring Boot',
+    'spring': 'Spring',
+}
+
+
+def job_to_row(job: Job) -> JobRow:
+    """Extrait d'un Job les colonnes utilisées par l'analyse"""
+    return JobRow(
+        job.title, job.description_text, job.source_category,
+        job.salary_text, job.salary_min, job.salary_max, job.salary_currency,
+        job.job_type, job.source,
+        job.salary_period, job.salary_annual_currency, job.salary_annual_min, job.salary_annual_max
+    )
+
+
+def job_rows_query():
+    """Requête ne projetant que les colonnes de JobRow"""
+    columns = [
+        JobDescription.text if field == 'description' else getattr(Job, field)
+        for field in JobRow._fields
+    ]
+    return db.session.query(*columns).select_from(Job).outerjoin(JobDescription)
+
+
+def normalize_tech(tech: str) -> str:
+    """Normalise les noms de technologies"""
+    return TECH_NORMALIZATIONS.get(tech.lower(), tech)
+
+
+# --- Expressions compilées une fois pour toutes -----------------------------
+
+# (forme minuscule, nom normalisé, regex avec word boundaries). La forme
+# minuscule sert de pré-filtre : `in` est bien plus rapide qu'une regex
+# commençant par \b, et la plupart des technologies sont absentes d'une offre.
+TECH_REGEXES = [
+    (tech.lower(), normalize_tech(tech), re.compile(r'\b' + re.escape(tech.lower()) + r'\b'))
+    for tech in TECHNOLOGIES
+]
+
+EXPERIENCE_REGEXES = [re.compile(pattern) for pattern in EXPERIENCE_PATTERNS[:5]]  # Patterns numériques
+
+EXPERIENCE_LEVELS = [
+    ('Junior (0-2 ans)', re.compile(r'junior|débutant|entry.?level|0.?2\s*ans')),
+    ('Confirmé (3-5 ans)', re.compile(r'confirmé|intermédiaire|mid.?level|3.?5\s*ans')),
+    ('Senior (5+ ans)', re.compile(r'senior|expert|lead|5\+?\s*ans|7\+?\s*ans|10\+?\s*ans')),
+]
+
+# Une alternative par diplôme : trouvée dès qu'un de ses patterns l'est
+DIPLOMA_REGEXES = [
+    (diploma_name, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)))
+    for diploma_name, patterns in DIPLOMAS.items()
+]
+
+# Testés dans l'ordre : le premier type qui correspond l'emporte
+SALARY_PATTERNS = [
+    ('hourly', [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:h|heure|hour)', r'(\d+(?:[.,]\d+)?)\s*€/h']),
+    ('daily', [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:j|jour|day|tjm)', r'tjm[:\s]*(\d+)']),
+    ('monthly', [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:mois|month)', r'(\d+)k?\s*(?:€|eur)?\s*/\s*mois']),
+    ('yearly', [r'(\d+(?:[.,]\d+)?)\s*k?\s*(?:€|eur|euros?)?\s*/?\s*(?:an|year|annuel)', r'(\d+)k?\s*(?:€|eur)?\s*/\s*an']),
+]
+SALARY_REGEXES = [
+    (rate_type, re.compile(pattern)) for rate_type, patterns in SALARY_PATTERNS for pattern in patterns
+]
+SALARY_AMOUNT_REGEX = re.compile(r'(\d+(?:[.,]\d+)?)\s*(?:k)?\s*(?:€|eur)')
+
+
+def parse_salary(text: str, sal_min: int = None, sal_max: int = None) -> Optional[Tuple[str, float, float]]:
+    """Parse le salaire depuis le texte ou les valeurs min/max"""
+    text_lower = text.lower()
+
+    # Type de salaire d'après le texte
+    for rate_type, regex in SALARY_REGEXES:
+        match = regex.search(text_lower)
+        if match:
+            value = float(match.group(1).replace(',', '.'))
+            # Gérer les valeurs en k (milliers)
+            if 'k' in text_lower and value < 1000:
+                value *= 1000
+            return (rate_type, value, value)
+
+    # Utiliser les valeurs min/max si disponibles
+    if sal_min or sal_max:
+        min_val = sal_min or sal_max
+        max_val = sal_max or sal_min
+
+        # Deviner le type basé sur la valeur
+        avg = (min_val + max_val) / 2
+        if avg < 100:
+            return ('hourly', min_val, max_val)
+        elif avg < 1500:
+            return ('daily', min_val, max_val)
+        elif avg < 15000:
+            return ('monthly', min_val, max_val)
+        else:
+            return ('yearly', min_val, max_val)
+
+    # Chercher juste un nombre avec € dans le texte
+    match = SALARY_AMOUNT_REGEX.search(text_lower)
+    if match:
+        value = float(match.group(1).replace(',', '.'))
+        if 'k' in text_lower and value < 1000:
+            value *= 1000
+
+        # Deviner le type
+        if value < 100:
+            return ('hourly', value, value)
+        elif value < 1500:
+            return ('daily', value, value)
+        elif value < 15000:
+            return ('monthly', value, value)
+        else:
+            return ('yearly', value, value)
+
+    return None
+
+
+def detect_currency(salary_text: Optional[str], salary_currency: str = None, source: str = None) -> str:
+    """Devise du salaire : colonne explicite, symbole dans le texte, sinon défaut de la source"""
+    if salary_currency:
+        return salary_currency.upper()
+
+    text = (salary_text or '').lower()
+    if '$' in text or 'usd' in text:
+        return 'USD'
+    if '£' in text or 'gbp' in text:
+        return 'GBP'
+    if '€' in text or 'eur' in text:
+        return 'EUR'
+
+    return SOURCE_CURRENCIES.get(source, 'EUR')
+
+
+def normalize_salary(
+    salary_text: Optional[str],
+    salary_min: int = None,
+    salary_max: int = None,
+    salary_currency: str = None,
+    source: str = None
+) -> Optional[Tuple[str, str, int, int]]:
+    """
+    Normalise un salaire une fois pour toutes (à l'ingestion).
+
+    Returns:
+        (période, devise, min annuel, max annuel) ou None si aucun salaire détecté
+    """
+    parsed = parse_salary(salary_text or '', salary_min, salary_max)
+    if not parsed:
+        return None
+
+    rate_type, min_val, max_val = parsed
+    factor = float(YEARLY_FACTORS[SALARY_TYPES.index(rate_type)])
+    return (
+        rate_type,
+        detect_currency(salary_text, salary_currency, source),
+        int(round(min_val * factor)),
+        int(round((max_val or min_val) * factor)),
+    )
+
+
+def annual_salary_floor(min_daily: int = None, min_annual: int = None) -> Optional[int]:
+    """Plancher annuel le plus strict entre un TJM minimum et un salaire annuel minimum"""
+    floors = []
+    if min_daily:
+        floors.append(int(min_daily * YEARLY_FACTORS[SALARY_TYPES.index('daily')]))
+    if min_annual:
+        floors.append(min_annual)
+    return max(floors) if floors else None
+
+
+def _sorted_percentiles(sorted_values: np.ndarray, percentiles) -> np.ndarray:
+    """Percentiles (interpolation linéaire, comme np.percentile) d'un tableau déjà trié"""
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (sorted_values.size - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, sorted_values.size - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (positions - lower)
+
+
+def _salary_summary(sorted_yearly: np.ndarray) -> Dict:
+    """Moyenne et percentiles (annuels) d'un tableau trié non vide"""
+    p10, p25, median, p75, p90 = _sorted_percentiles(sorted_yearly, SALARY_PERCENTILES)
+    return {
+        'count': int(sorted_yearly.size),
+        'mean': round(float(sorted_yearly.mean()), 2),
+        'p10': round(float(p10), 2),
+        'p25': round(float(p25), 2),
+        'median': round(float(median), 2),
+        'p75': round(float(p75), 2),
+        'p90': round(float(p90), 2),
+    }
+
+
+def _grouped_summaries(yearly: np.ndarray, labels: List[str]) -> Dict[str, Dict]:
+    """_salary_summary par groupe (devise, type de contrat...), trié par effectif"""
+    # Factorisation via dict (boucles en C) : bien plus rapide qu'un np.unique sur des objets
+    index = {label: code for code, label in enumerate(dict.fromkeys(labels))}
+    codes = np.fromiter(map(index.__getitem__, labels), dtype=np.intp, count=len(labels))
+
+    # Tri stable par code (radix sort sur des entiers), puis tri de chaque segment
+    order = np.argsort(codes, kind='stable')
+    groups = np.split(yearly[order], np.cumsum(np.bincount(codes))[:-1])
+
+    summaries = {str(key): _salary_summary(np.sort(group)) for key, group in zip(index, groups)}
+    return dict(sorted(summaries.items(), key=lambda item: (-item[1]['count'], item[0])))
+
+
+def _most_common(counter: Counter, limit: int = None) -> List[Tuple[str, int]]:
+    """most_common() avec départage stable par nom (indépendant de l'ordre de fusion)"""
+    items = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    return items[:limit] if limit is not None else items
+
+
+# --- Analyse (map) -----------------------------------------------------------
+# Une seule passe par chunk : le texte de chaque offre est construit et mis
+# en minuscules une fois, puis alimente tous les agrégats. Le résultat
+# partiel est fusionnable ; _run_passes tourne tel quel dans un process pool.
+
+def _find_technologies(text_lower: str) -> set:
+    """Technologies (normalisées) citées dans un texte déjà en minuscules"""
+    return {name for lower, name, regex in TECH_REGEXES if lower in text_lower and regex.search(text_lower)}
+
+
+def _empty_salary_partial() -> Dict[str, List]:
+    # Colonnes parallèles (valeurs déjà annualisées), converties en tableaux NumPy au moment des stats
+    return {'types': [], 'yearly': [], 'currencies': [], 'job_types': []}
+
+
+def _empty_experience_partial() -> Dict:
+    return {'count': 0, 'total': 0.0, 'buckets': Counter(), 'levels': Counter()}
+
+
+def _add_salary(partial: Dict[str, List], row: JobRow):
+    if row.salary_period:
+        # Déjà normalisé à l'ingestion : pas de re-parsing
+        rate_type = row.salary_period
+        yearly = (row.salary_annual_min + row.salary_annual_max) / 2
+        currency = row.salary_annual_currency or detect_currency(row.salary_text, row.salary_currency, row.source)
+    else:
+        parsed = parse_salary(row.salary_text or '', row.salary_min, row.salary_max)
+        if not parsed:
+            return
+        rate_type, min_val, max_val = parsed
+        avg = (min_val + max_val) / 2 if max_val else min_val
+        yearly = avg * YEARLY_FACTORS[SALARY_TYPES.index(rate_type)]
+        currency = detect_currency(row.salary_text, row.salary_currency, row.source)
+
+    partial['types'].append(SALARY_TYPES.index(rate_type))
+    partial['yearly'].append(float(yearly))
+    partial['currencies'].append(currency)
+    partial['job_types'].append(row.job_type or 'unknown')
+
+
+def _add_experience(partial: Dict, text_lower: str):
+    for regex in EXPERIENCE_REGEXES:
+        match = regex.search(text_lower)
+        if match:
+            min_years = int(match.group(1))
+            max_years = int(match.group(2)) if match.lastindex >= 2 and match.group(2) else min_years
+            years = (min_years + max_years) / 2
+            partial['count'] += 1
+            partial['total'] += years
+            if years <= 2:
+                partial['buckets']['0-2 ans'] += 1
+            elif years <= 5:
+                partial['buckets']['3-5 ans'] += 1
+            elif years <= 10:
+                partial['buckets']['5-10 ans'] += 1
+            else:
+                partial['buckets']['10+ ans'] += 1
+            break
+
+    # Détecter le niveau
+    for level, regex in EXPERIENCE_LEVELS:
+        if regex.search(text_lower):
+            partial['levels'][level] += 1
+            break
+
+
+def _run_passes(rows: List[JobRow]) -> Dict:
+    """Analyse complète d'un chunk (point d'entrée des workers)"""
+    technologies = Counter()
+    salaries = _empty_salary_partial()
+    experience = _empty_experience_partial()
+    education = Counter()
+
+    for row in rows:
+        text_lower = f"{row.title} {row.description or ''}".lower()
+
+        # Les technologies regardent aussi la catégorie de la source
+        technologies.update(_find_technologies(f"{text_lower} {(row.source_category or '').lower()}"))
+        _add_salary(salaries, row)
+        _add_experience(experience, text_lower)
+        # Ne compter qu'une fois par diplôme
+        education.update(name for name, regex in DIPLOMA_REGEXES if regex.search(text_lower))
+
+    return {
+        'technologies': technologies,
+        'salaries': salaries,
+        'experience': experience,
+        'education': education,
+        'total_jobs': len(rows),
+    }
+
+
+def count_technologies(rows: List[JobRow]) -> Counter:
+    """Nombre d'offres mentionnant chaque technologie (une fois par offre)"""
+    tech_counter = Counter()
+    for row in rows:
+        tech_counter.update(_find_technologies(
+            f"{row.title} {row.description or ''} {row.source_category or ''}".lower()
+        ))
+    return tech_counter
+
+
+def _merge_partials(partials: Iterable[Dict]) -> Dict:
+    """Fusionne au fil de l'eau les résultats partiels des chunks (reduce)"""
+    merged = {
+        'technologies': Counter(),
+        'salaries': _empty_salary_partial(),
+        'experience': _empty_experience_partial(),
+        'education': Counter(),
+        'total_jobs': 0,
+    }
+
+    for partial in partials:
+        merged['technologies'].update(partial['technologies'])
+        for column, values in partial['salaries'].items():
+            merged['salaries'][column].extend(values)
+        exp = partial['experience']
+        merged['experience']['count'] += exp['count']
+        merged['experience']['total'] += exp['total']
+        merged['experience']['buckets'].update(exp['buckets'])
+        merged['experience']['levels'].update(exp['levels'])
+        merged['education'].update(partial['education'])
+        merged['total_jobs'] += partial['total_jobs']
+
+    return merged
+
+
+class MarketAnalyzer:
+    """Analyse le marché à partir des offres d'emploi"""
 
-            found_techs = set()  # Éviter les doublons par offre
-            for tech in TECHNOLOGIES:
-                # Recherche avec word boundaries
-                pattern = r'\b' + re.escape(tech.lower()) + r'\b'
-                if re.search(pattern, text_lower):
-                    # Normaliser certains noms
-                    normalized = self._normalize_tech(tech)
-                    found_techs.add(normalized)
+    def __init__(
+        self,
+        jobs: Iterable = None,
+        workers: int = 1,
+        parallel_min_jobs: int = 2000,
+        chunk_size: int = 500
+    ):
+        """
+        Args:
+            jobs: Offres à analyser : Job ORM, JobRow ou tuples dans l'ordre de
+                  JobRow (liste ou itérateur, consommé une seule fois)
+            workers: Nombre de processus pour l'analyse (1 = série)
+            parallel_min_jobs: En dessous de ce volume, l'analyse reste en série
+            chunk_size: Nombre d'offres par chunk
+        """
+        self.workers = max(1, workers or 1)
+        self.parallel_min_jobs = parallel_min_jobs
+        self.chunk_size = chunk_size
+        self.set_jobs([] if jobs is None else jobs)
+
+    def set_jobs(self, jobs: Iterable):
+        self.jobs = jobs
+        self._results = None
 
-            for tech in found_techs:
-                tech_counter[tech] += 1
+    def _iter_rows(self) -> Iterator[JobRow]:
+        for job in self.jobs:
+            if isinstance(job, JobRow):
+                yield job
+            elif isinstance(job, Job):
+                yield job_to_row(job)
+            else:
+                yield JobRow._make(job)
+
+    def _iter_chunks(self) -> Iterator[List[JobRow]]:
+        chunk = []
+        for row in self._iter_rows():
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _aggregate(self) -> Dict:
+        """Une seule passe en streaming sur les offres, toutes analyses confondues"""
+        if self._results is None:
+            self._results = _merge_partials(self._map_chunks())
+        return self._results
+
+    def _map_chunks(self) -> Iterator[Dict]:
+        chunks = self._iter_chunks()
+
+        if self.workers > 1:
+            # On ne lance le pool qu'au-delà du seuil ; en dessous, tout reste en série
+            buffered, count = [], 0
+            for chunk in chunks:
+                buffered.append(chunk)
+                count += len(chunk)
+                if count >= self.parallel_min_jobs:
+                    yield from self._map_parallel(itertools.chain(buffered, chunks))
+                    return
+            chunks = iter(buffered)
+
+        for chunk in chunks:
+            yield _run_passes(chunk)
+
+    def _map_parallel(self, chunks: Iterator[List[JobRow]]) -> Iterator[Dict]:
+        """Exécute les chunks dans un process pool, avec un nombre borné de chunks en vol"""
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_run_passes, chunk))
+                if len(pending) >= self.workers * 2:
+                    # Résultats consommés dans l'ordre de soumission : fusion déterministe
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
 
-        return tech_counter.most_common(limit)
+    def analyze_technologies(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Compte les technologies mentionnées dans les offres"""
+        tech_counter = self._aggregate()['technologies']
+        return _most_common(tech_counter, limit)
 
     def _normalize_tech(self, tech: str) -> str:
         """Normalise les noms de technologies"""
-        normalizations = {
-            'vue.js': 'Vue.js',
-            'vue': 'Vue.js',
-            'node.js': 'Node.js',
-            'react native': 'React Native',
-            'ruby on rails': 'Rails',
-            'rails': 'Rails',
-            'k8s': 'Kubernetes',
-            'gcp': 'Google Cloud',
-            'google cloud': 'Google Cloud',
-            'spring boot': 'Spring Boot',
-            'spring': 'Spring',
-        }
-        return normalizations.get(tech.lower(), tech)
+        return normalize_tech(tech)
 
     def analyze_salaries(self) -> Dict:
-        """Analyse les salaires et calcule les moyennes"""
-        hourly_rates = []
-        daily_rates = []
-        monthly_rates = []
-        yearly_rates = []
-
-        for job in self.jobs:
-            salary_text = job.salary_text or ''
-            salary_min = job.salary_min
-            salary_max = job.salary_max
-
-            # Parser le texte du salaire
-            parsed = self._parse_salary(salary_text, salary_min, salary_max)
-            if parsed:
-                rate_type, min_val, max_val = parsed
-                avg = (min_val + max_val) / 2 if max_val else min_val
-
-                if rate_type == 'hourly':
-                    hourly_rates.append(avg)
-                elif rate_type == 'daily':
-                    daily_rates.append(avg)
-                elif rate_type == 'monthly':
-                    monthly_rates.append(avg)
-                elif rate_type == 'yearly':
-                    yearly_rates.append(avg)
-
-        # Convertir tout en différentes unités
-        all_yearly = []
-
-        # Convertir les taux horaires en annuel (1600h/an pour freelance)
-        for h in hourly_rates:
-            all_yearly.append(h * 1600)
-
-        # Convertir les taux journaliers en annuel (218 jours/an)
-        for d in daily_rates:
-            all_yearly.append(d * 218)
-
-        # Convertir les taux mensuels en annuel
-        for m in monthly_rates:
-            all_yearly.append(m * 12)
-
-        # Ajouter les annuels directement
-        all_yearly.extend(yearly_rates)
-
-        if not all_yearly:
+        """
+        Analyse les salaires : moyenne, percentiles, histogramme et ventilations.
+        Les chiffres de synthèse portent sur HEADLINE_CURRENCY seulement ;
+        by_currency garde toutes les devises, chacune sur sa propre échelle.
+        """
+        partial = self._aggregate()['salaries']
+
+        all_yearly = np.array(partial['yearly'], dtype=np.float64)
+        by_currency = _grouped_summaries(all_yearly, partial['currencies']) if all_yearly.size else {}
+
+        headline = np.array(partial['currencies'], dtype=object) == HEADLINE_CURRENCY
+        types = np.array(partial['types'], dtype=np.intp)[headline]
+        yearly = all_yearly[headline]
+        raw_counts = np.bincount(types, minlength=len(SALARY_TYPES))
+
+        if not yearly.size:
             return {
                 'hourly': None,
                 'daily': None,
                 'monthly': None,
                 'yearly': None,
-                'sample_size': 0
+                'currency': HEADLINE_CURRENCY,
+                'sample_size': 0,
+                'by_currency': by_currency,
             }
 
-        avg_yearly = sum(all_yearly) / len(all_yearly)
+        sorted_yearly = np.sort(yearly)
+        avg_yearly = float(yearly.mean())
+        median_yearly = float(_sorted_percentiles(sorted_yearly, [50])[0])
+
+        # Histogramme borné au p99 pour que quelques valeurs aberrantes n'écrasent pas les classes
+        upper = float(_sorted_percentiles(sorted_yearly, [99])[0])
+        counts, edges = np.histogram(np.minimum(sorted_yearly, upper), bins=SALARY_HISTOGRAM_BINS)
 
         return {
             'hourly': round(avg_yearly / 1600, 2),
             'daily': round(avg_yearly / 218, 2),
             'monthly': round(avg_yearly / 12, 2),
             'yearly': round(avg_yearly, 2),
-            'sample_size': len(all_yearly),
+            'currency': HEADLINE_CURRENCY,
+            'sample_size': int(yearly.size),
             'raw_counts': {
-                'hourly': len(hourly_rates),
-                'daily': len(daily_rates),
-                'monthly': len(monthly_rates),
-                'yearly': len(yearly_rates)
-            }
+                rate_type: int(count) for rate_type, count in zip(SALARY_TYPES, raw_counts)
+            },
+            'percentiles': _salary_summary(sorted_yearly),
+            'median': {
+                'hourly': round(median_yearly / 1600, 2),
+                'daily': round(median_yearly / 218, 2),
+                'monthly': round(median_yearly / 12, 2),
+                'yearly': round(median_yearly, 2),
+            },
+            'histogram': {
+                'edges': [round(float(edge), 2) for edge in edges],
+                'counts': counts.tolist(),
+            },
+            'by_currency': by_currency,
+            'by_job_type': _grouped_summaries(yearly, [
+                job_type for job_type, keep in zip(partial['job_types'], headline) if keep
+            ]),
         }
 
     def _parse_salary(self, text: str, sal_min: int = None, sal_max: int = None) -> Optional[Tuple[str, float, float]]:
         """Parse le salaire depuis le texte ou les valeurs min/max"""
-        text_lower = text.lower()
-
-        # Patterns pour détecter le type de salaire
-        patterns = {
-            'hourly': [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:h|heure|hour)', r'(\d+(?:[.,]\d+)?)\s*€/h'],
-            'daily': [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:j|jour|day|tjm)', r'tjm[:\s]*(\d+)'],
-            'monthly': [r'(\d+(?:[.,]\d+)?)\s*(?:€|eur|euros?)?\s*/?\s*(?:mois|month)', r'(\d+)k?\s*(?:€|eur)?\s*/\s*mois'],
-            'yearly': [r'(\d+(?:[.,]\d+)?)\s*k?\s*(?:€|eur|euros?)?\s*/?\s*(?:an|year|annuel)', r'(\d+)k?\s*(?:€|eur)?\s*/\s*an'],
-        }
-
-        for rate_type, pats in patterns.items():
-            for pattern in pats:
-                match = re.search(pattern, text_lower)
-                if match:
-                    value = float(match.group(1).replace(',', '.'))
-                    # Gérer les valeurs en k (milliers)
-                    if 'k' in text_lower and value < 1000:
-                        value *= 1000
-                    return (rate_type, value, value)
-
-        # Utiliser les valeurs min/max si disponibles
-        if sal_min or sal_max:
-            min_val = sal_min or sal_max
-            max_val = sal_max or sal_min
-
-            # Deviner le type basé sur la valeur
-            avg = (min_val + max_val) / 2
-            if avg < 100:
-                return ('hourly', min_val, max_val)
-            elif avg < 1500:
-                return ('daily', min_val, max_val)
-            elif avg < 15000:
-                return ('monthly', min_val, max_val)
-            else:
-                return ('yearly', min_val, max_val)
-
-        # Chercher juste un nombre avec € dans le texte
-        match = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:k)?\s*(?:€|eur)', text_lower)
-        if match:
-            value = float(match.group(1).replace(',', '.'))
-            if 'k' in text_lower and value < 1000:
-                value *= 1000
-
-            # Deviner le type
-            if value < 100:
-                return ('hourly', value, value)
-            elif value < 1500:
-                return ('daily', value, value)
-            elif value < 15000:
-                return ('monthly', value, value)
-            else:
-                return ('yearly', value, value)
-
-        return None
+        return parse_salary(text, sal_min, sal_max)
 
     def analyze_experience(self) -> Dict:
         """Analyse les années d'expérience requises"""
-        experience_years = []
-        levels = Counter()
+        partial = self._aggregate()['experience']
 
-        for job in self.jobs:
-            text = f"{job.title} {job.description or ''}"
-            text_lower = text.lower()
-
-            # Chercher les patterns d'expérience
-            for pattern in EXPERIENCE_PATTERNS[:5]:  # Patterns numériques
-                match = re.search(pattern, text_lower)
-                if match:
-                    min_years = int(match.group(1))
-                    max_years = int(match.group(2)) if match.lastindex >= 2 and match.group(2) else min_years
-                    experience_years.append((min_years + max_years) / 2)
-                    break
-
-            # Détecter le niveau
-            if re.search(r'junior|débutant|entry.?level|0.?2\s*ans', text_lower):
-                levels['Junior (0-2 ans)'] += 1
-            elif re.search(r'confirmé|intermédiaire|mid.?level|3.?5\s*ans', text_lower):
-                levels['Confirmé (3-5 ans)'] += 1
-            elif re.search(r'senior|expert|lead|5\+?\s*ans|7\+?\s*ans|10\+?\s*ans', text_lower):
-                levels['Senior (5+ ans)'] += 1
-
-        avg_years = sum(experience_years) / len(experience_years) if experience_years else None
+        avg_years = partial['total'] / partial['count'] if partial['count'] else None
 
         return {
             'average_years': round(avg_years, 1) if avg_years else None,
-            'sample_size': len(experience_years),
-            'levels': dict(levels.most_common()),
+            'sample_size': partial['count'],
+            'levels': dict(_most_common(partial['levels'])),
             'distribution': {
-                '0-2 ans': len([x for x in experience_years if x <= 2]),
-                '3-5 ans': len([x for x in experience_years if 2 < x <= 5]),
-                '5-10 ans': len([x for x in experience_years if 5 < x <= 10]),
-                '10+ ans': len([x for x in experience_years if x > 10]),
+                bucket: partial['buckets'][bucket]
+                for bucket in ('0-2 ans', '3-5 ans', '5-10 ans', '10+ ans')
             }
         }
 
     def analyze_education(self) -> Dict:
         """Analyse les diplômes requis"""
-        diploma_counter = Counter()
-
-        for job in self.jobs:
-            text = f"{job.title} {job.description or ''}"
-            text_lower = text.lower()
-
-            for diploma_name, patterns in DIPLOMAS.items():
-                for pattern in patterns:
-                    if re.search(pattern, text_lower):
-                        diploma_counter[diploma_name] += 1
-                        break  # Ne compter qu'une fois par diplôme
+        diploma_counter = self._aggregate()['education']
 
         return {
-            'distribution': dict(diploma_counter.most_common()),
+            'distribution': dict(_most_common(diploma_counter)),
             'total_with_requirement': sum(diploma_counter.values()),
-            'total_jobs': len(self.jobs)
+            'total_jobs': self._aggregate()['total_jobs']
         }
 
     def get_full_analysis(self) -> Dict:
@@ -314,5 +640,5 @@ class MarketAnalyzer:
             'salaries': self.analyze_salaries(),
             'experience': self.analyze_experience(),
             'education': self.analyze_education(),
-            'total_jobs': len(self.jobs)
+            'total_jobs': self._aggregate()['total_jobs']
         }
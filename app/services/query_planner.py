@@ -0,0 +1,153 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from app import db
+from app.models import QueryStat
+
+
+# Runs of history looked at per source
+HISTORY_RUNS = 10
+
+
+@dataclass
+class QueryPlan:
+    """Queries to send to one source in the next run, best yield first"""
+    source: str
+    run: List[str]
+    skipped: List[str] = field(default_factory=list)
+    # Estimates from history: requests not made, new jobs those requests brought on average
+    calls_saved: float = 0.0
+    jobs_lost: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'run': self.run,
+            'skipped': self.skipped,
+            'calls_saved': round(self.calls_saved, 1),
+            'jobs_lost': round(self.jobs_lost, 1),
+        }
+
+
+def query_history(source_name: str, runs: int = HISTORY_RUNS) -> Dict:
+    """
+    Recent statistics of a source's queries.
+
+    Returns {'runs': [run_at, ... newest first], 'queries': {query: {
+    runs, calls, results, new_ids, last_run_at, yield}}} where `yield` is
+    new ids per request over the window.
+    """
+    run_times = [
+        run_at for (run_at,) in db.session.query(QueryStat.run_at)
+        .filter(QueryStat.source == source_name)
+        .distinct().order_by(QueryStat.run_at.desc()).limit(runs)
+    ]
+    if not run_times:
+        return {'runs': [], 'queries': {}}
+
+    stats = QueryStat.query.filter(
+        QueryStat.source == source_name,
+        QueryStat.run_at >= run_times[-1]
+    )
+
+    queries = defaultdict(lambda: {'runs': 0, 'calls': 0, 'results': 0, 'new_ids': 0, 'last_run_at': None})
+    for stat in stats:
+        entry = queries[stat.keyword]
+        entry['runs'] += 1
+        entry['calls'] += stat.calls
+        entry['results'] += stat.results
+        entry['new_ids'] += stat.new_ids
+        if entry['last_run_at'] is None or stat.run_at > entry['last_run_at']:
+            entry['last_run_at'] = stat.run_at
+
+    for entry in queries.values():
+        entry['yield'] = entry['new_ids'] / max(entry['calls'], 1)
+
+    return {'runs': run_times, 'queries': dict(queries)}
+
+
+def plan_queries(source_name: str, queries: Iterable[str]) -> QueryPlan:
+    """
+    Order and prune a source's queries by marginal yield.
+
+    Queries with fewer than QUERY_PLANNER_MIN_RUNS runs of history always
+    run. Above that, a query bringing less than QUERY_PLANNER_MIN_YIELD new
+    jobs per request only runs once every QUERY_PLANNER_PERIOD runs. Queries
+    that run are ordered by yield, so the best ones get the new ids and
+    overlapping ones see their marginal yield drop.
+    """
+    config = current_app.config
+    min_runs = config.get('QUERY_PLANNER_MIN_RUNS', 3)
+    min_yield = config.get('QUERY_PLANNER_MIN_YIELD', 0.2)
+    period = config.get('QUERY_PLANNER_PERIOD', 4)
+
+    queries = list(dict.fromkeys(queries))
+    history = query_history(source_name)
+    runs = history['runs']
+
+    plan = QueryPlan(source=source_name, run=[])
+    scores = {}
+    for query in queries:
+        entry = history['queries'].get(query)
+        if entry is None or entry['runs'] < min_runs:
+            scores[query] = float('inf')
+            plan.run.append(query)
+            continue
+
+        scores[query] = entry['yield']
+        if entry['yield'] >= min_yield:
+            plan.run.append(query)
+            continue
+
+        # Low yield: due again once `period` runs went by without it
+        runs_since = sum(1 for run_at in runs if run_at > entry['last_run_at'])
+        if runs_since + 1 >= period:
+            plan.run.append(query)
+        else:
+            plan.skipped.append(query)
+            plan.calls_saved += entry['calls'] / entry['runs']
+            plan.jobs_lost += entry['new_ids'] / entry['runs']
+
+    plan.run.sort(key=lambda query: scores[query], reverse=True)
+    return plan
+
+
+def plan_sources(aggregator, sources: Optional[List[str]] = None) -> Dict[str, QueryPlan]:
+    """Plans for the enabled sources that support query planning"""
+    if not current_app.config.get('QUERY_PLANNER_ENABLED', True):
+        return {}
+
+    plans = {}
+    for source_name in aggregator.source_names:
+        if sources and source_name not in sources:
+            continue
+        fetcher = aggregator.get_fetcher(source_name)
+        if fetcher is None or not fetcher.QUERY_PARAM:
+            continue
+        plans[source_name] = plan_queries(source_name, fetcher.default_queries())
+    return plans
+
+
+def record_query_stats(source_name: str, query_stats: Dict[str, Dict], run_at: datetime = None):
+    """
+    Store one run's per-query statistics. `query_stats` is filled by the
+    fetcher in execution order: {query: {'calls': n, 'ids': [...]}}. The
+    caller commits.
+    """
+    if not query_stats:
+        return
+
+    run_at = run_at or datetime.utcnow()
+    seen = set()
+    for query, stats in query_stats.items():
+        ids = set(stats['ids'])
+        db.session.add(QueryStat(
+            source=source_name,
+            keyword=query,
+            run_at=run_at,
+            calls=stats['calls'],
+            results=len(ids),
+            new_ids=len(ids - seen),
+        ))
+        seen |= ids
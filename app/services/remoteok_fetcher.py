@@ -1,6 +1,6 @@
 import requests
 from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
 
 
 class RemoteOKFetcher(BaseFetcher):
@@ -15,8 +15,19 @@ class RemoteOKFetcher(BaseFetcher):
 
     # Tags to fetch for cloud/AWS jobs
     CLOUD_TAGS = ['devops', 'cloud', 'aws', 'sysadmin', 'backend', 'infra']
-
-    def fetch_jobs(self, tags: List[str] = None, **kwargs) -> List[JobData]:
+    QUERY_PARAM = 'tags'
+
+    def default_queries(self) -> List[str]:
+        return self.CLOUD_TAGS + ['']  # '' = all jobs
+
+    def fetch_jobs(
+        self,
+        tags: List[str] = None,
+        budget: FetchBudget = None,
+        query_stats: Dict[str, Dict] = None,
+        **kwargs
+    ) -> List[JobData]:
+        budget = budget or FetchBudget()
         headers = {
             'User-Agent': 'FreelanceJobFetcher/1.0'
         }
@@ -25,28 +36,36 @@ class RemoteOKFetcher(BaseFetcher):
 
         # If no tags specified, use cloud tags + general fetch
         if tags is None:
-            tags = self.CLOUD_TAGS + [None]  # None = all jobs
+            tags = self.default_queries()
 
         for tag in tags:
+            if budget.stop(len(all_jobs)):
+                break
+
             try:
                 url = self.API_URL
                 if tag:
                     url = f"{self.API_URL}?tag={tag}"
 
-                response = requests.get(url, headers=headers, timeout=30)
+                response = requests.get(url, headers=headers, timeout=budget.timeout(30))
                 response.raise_for_status()
                 data = response.json()
 
                 # First item is legal notice, skip it
                 jobs = data[1:] if data and len(data) > 1 else []
 
+                ids = []
                 for job in jobs:
                     if job.get('position') and job.get('id'):
                         job_id = str(job.get('id'))
+                        ids.append(job_id)
                         if job_id not in all_jobs:
                             all_jobs[job_id] = job
+                self._record_query(query_stats, tag, ids, 1)
 
-            except Exception:
+            except Exception as e:
+                # No stats for a failed request: it says nothing about the tag's yield
+                budget.record_error(tag or 'all', e)
                 continue
 
         return [self.normalize_job(job) for job in all_jobs.values()]
@@ -72,6 +91,7 @@ class RemoteOKFetcher(BaseFetcher):
             job_type='remote',
             salary_min=salary_min,
             salary_max=salary_max,
+            salary_currency='USD' if salary_min or salary_max else None,
             salary_text=salary_text,
             url=raw_job.get('url', ''),
             company_logo=raw_job.get('company_logo', ''),
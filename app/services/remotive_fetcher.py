@@ -1,6 +1,6 @@
 import requests
 from typing import List, Dict
-from .base_fetcher import BaseFetcher, JobData
+from .base_fetcher import BaseFetcher, FetchBudget, JobData
 
 
 class RemotiveFetcher(BaseFetcher):
@@ -14,7 +14,8 @@ class RemotiveFetcher(BaseFetcher):
     SOURCE_NAME = "remotive"
     API_URL = "https://remotive.com/api/remote-jobs"
 
-    def fetch_jobs(self, category: str = None, **kwargs) -> List[JobData]:
+    def fetch_jobs(self, category: str = None, budget: FetchBudget = None, **kwargs) -> List[JobData]:
+        budget = budget or FetchBudget()
         params = {}
         if category:
             params['category'] = category
@@ -22,7 +23,7 @@ class RemotiveFetcher(BaseFetcher):
         response = requests.get(
             self.API_URL,
             params=params,
-            timeout=30
+            timeout=budget.timeout(30)
         )
         response.raise_for_status()
 
@@ -0,0 +1,217 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from app import db
+from app.models import Job, TechDailyRollup, SalaryDailyRollup, JobDailyRollup
+from app.services.market_analyzer import count_technologies, job_to_row
+
+
+def rollup_day(job: Job) -> date:
+    """Day a job is counted on: posted_at, or when we first saw it"""
+    moment = job.posted_at or job.fetched_at or job.created_at or datetime.utcnow()
+    return moment.date()
+
+
+def update_rollups(jobs: Iterable[Job]):
+    """
+    Add newly ingested jobs to the daily rollup tables.
+
+    Jobs must already have their salary normalized (Job.normalize_salary).
+    Counters are incremented with INSERT ... ON CONFLICT DO UPDATE, in the
+    session transaction; the caller commits.
+    """
+    jobs_by_day = defaultdict(list)
+    for job in jobs:
+        jobs_by_day[rollup_day(job)].append(job)
+    if not jobs_by_day:
+        return
+
+    tech_counts = Counter()
+    salary_stats = {}
+    job_counts = Counter()
+
+    for day, day_jobs in jobs_by_day.items():
+        for tech, count in count_technologies([job_to_row(job) for job in day_jobs]).items():
+            tech_counts[(day, tech)] += count
+
+        for job in day_jobs:
+            job_counts[(day, job.source, job.job_type or 'unknown')] += 1
+
+            if job.salary_period:
+                key = (day, job.salary_annual_currency or 'EUR')
+                count, total, low, high = salary_stats.get(key, (0, 0.0, None, None))
+                annual = (job.salary_annual_min + job.salary_annual_max) / 2
+                salary_stats[key] = (
+                    count + 1,
+                    total + annual,
+                    job.salary_annual_min if low is None else min(low, job.salary_annual_min),
+                    job.salary_annual_max if high is None else max(high, job.salary_annual_max),
+                )
+
+    # Upserts add to the stored counters in the database, so concurrent
+    # ingestions never lose an increment nor collide on a new row. Rows go
+    # in key order: two writers lock them in the same order (no deadlock).
+    _upsert_add(TechDailyRollup, ('day', 'technology'), [
+        {'day': day, 'technology': tech, 'mentions': count}
+        for (day, tech), count in sorted(tech_counts.items())
+    ], ('mentions',))
+
+    _upsert_add(JobDailyRollup, ('day', 'source', 'job_type'), [
+        {'day': day, 'source': source, 'job_type': job_type, 'jobs': count}
+        for (day, source, job_type), count in sorted(job_counts.items())
+    ], ('jobs',))
+
+    rows = [
+        {'day': day, 'currency': currency, 'jobs_with_salary': count, 'annual_sum': total,
+         'annual_min': low, 'annual_max': high}
+        for (day, currency), (count, total, low, high) in sorted(salary_stats.items())
+    ]
+    if rows:
+        table = SalaryDailyRollup.__table__
+        stmt = _insert(SalaryDailyRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'currency'],
+            set_={
+                'jobs_with_salary': table.c.jobs_with_salary + stmt.excluded.jobs_with_salary,
+                'annual_sum': table.c.annual_sum + stmt.excluded.annual_sum,
+                'annual_min': db.case(
+                    (db.or_(table.c.annual_min.is_(None), stmt.excluded.annual_min < table.c.annual_min),
+                     stmt.excluded.annual_min),
+                    else_=table.c.annual_min
+                ),
+                'annual_max': db.case(
+                    (db.or_(table.c.annual_max.is_(None), stmt.excluded.annual_max > table.c.annual_max),
+                     stmt.excluded.annual_max),
+                    else_=table.c.annual_max
+                ),
+            }
+        )
+        db.session.execute(stmt, rows)
+
+
+def _insert(model):
+    """INSERT supporting ON CONFLICT DO UPDATE, for the SQLite and PostgreSQL backends"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'Rollups need SQLite or PostgreSQL (upserts), not {dialect}')
+    return insert(model)
+
+
+def _upsert_add(model, keys, rows: List[Dict], counters):
+    """Insert rows, or add their `counters` to the existing ones with the same keys"""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = _insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + stmt.excluded[column] for column in counters}
+    )
+    db.session.execute(stmt, rows)
+
+
+def rebuild_rollups(batch_size: int = 500) -> int:
+    """Drop and recompute every rollup from the jobs table. Returns the number of jobs."""
+    TechDailyRollup.query.delete()
+    SalaryDailyRollup.query.delete()
+    JobDailyRollup.query.delete()
+    db.session.flush()
+
+    total = 0
+    last_id = 0
+    while True:
+        jobs = Job.query.filter(Job.id > last_id).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+        update_rollups(jobs)
+        db.session.flush()
+        total += len(jobs)
+        last_id = jobs[-1].id
+
+    db.session.commit()
+    return total
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def get_trends(
+    periods: int = 12,
+    granularity: str = 'week',
+    technologies: Optional[List[str]] = None,
+    top: int = 8
+) -> Dict:
+    """
+    Technology, job volume and salary trends, read from the rollup tables only.
+
+    Args:
+        periods: Number of days/weeks to return, ending with the current one
+        granularity: 'day' or 'week' (weeks start on Monday)
+        technologies: Technologies to include (default: the `top` most mentioned in the window)
+    """
+    today = date.today()
+    step = timedelta(weeks=1) if granularity == 'week' else timedelta(days=1)
+    last = _period_start(today, granularity)
+    starts = [last - step * i for i in reversed(range(periods))]
+    since = starts[0]
+    until = last + step
+    position = {start: i for i, start in enumerate(starts)}
+
+    # Job volume
+    jobs = [0] * periods
+    by_source = defaultdict(lambda: [0] * periods)
+    rows = db.session.query(
+        JobDailyRollup.day, JobDailyRollup.source, db.func.sum(JobDailyRollup.jobs)
+    ).filter(JobDailyRollup.day >= since, JobDailyRollup.day < until).group_by(JobDailyRollup.day, JobDailyRollup.source)
+    for day, source, count in rows:
+        i = position[_period_start(day, granularity)]
+        jobs[i] += count
+        by_source[source][i] += count
+
+    # Technologies
+    mentions = defaultdict(lambda: [0] * periods)
+    for day, tech, count in db.session.query(
+        TechDailyRollup.day, TechDailyRollup.technology, TechDailyRollup.mentions
+    ).filter(TechDailyRollup.day >= since, TechDailyRollup.day < until):
+        mentions[tech][position[_period_start(day, granularity)]] += count
+
+    if technologies is None:
+        technologies = sorted(mentions, key=lambda t: (-sum(mentions[t]), t))[:top]
+
+    # Salaries (mean annual per currency)
+    salary_sums = defaultdict(lambda: [[0, 0.0] for _ in range(periods)])
+    for day, currency, count, total in db.session.query(
+        SalaryDailyRollup.day, SalaryDailyRollup.currency,
+        SalaryDailyRollup.jobs_with_salary, SalaryDailyRollup.annual_sum
+    ).filter(SalaryDailyRollup.day >= since, SalaryDailyRollup.day < until):
+        bucket = salary_sums[currency][position[_period_start(day, granularity)]]
+        bucket[0] += count
+        bucket[1] += total
+
+    return {
+        'granularity': granularity,
+        'periods': [start.isoformat() for start in starts],
+        'jobs': jobs,
+        'jobs_by_source': dict(by_source),
+        'technologies': {
+            tech: {
+                'mentions': mentions[tech],
+                'share': [
+                    round(100 * count / total, 1) if total else None
+                    for count, total in zip(mentions[tech], jobs)
+                ],
+            }
+            for tech in technologies
+        },
+        'salaries': {
+            currency: [round(total / count, 2) if count else None for count, total in buckets]
+            for currency, buckets in salary_sums.items()
+        },
+    }
@@ -0,0 +1,111 @@
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+from app import db
+from app.models import Job, SavedSearch, SavedSearchMatch
+from app.services.market_analyzer import annual_salary_floor
+
+
+# Words, keeping the punctuation of tech names (c#, c++, node.js, ci-cd)
+TOKEN_PATTERN = re.compile(r'[\w#+]+(?:[.\-][\w#+]+)*')
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """Distinct lowercased words of a text"""
+    return set(TOKEN_PATTERN.findall(text.lower())) if text else set()
+
+
+class IndexedSearch(NamedTuple):
+    id: int
+    terms: FrozenSet[str]
+    source: Optional[str]
+    job_type: Optional[str]
+    tag: Optional[str]
+    min_salary: Optional[int]
+
+
+class Percolator:
+    """
+    Matches new jobs against every saved search at once.
+
+    Each search is indexed under one of its words (the longest, a cheap
+    stand-in for the rarest). A job only looks up the words it contains,
+    then checks the few candidate searches, so matching costs about
+    O(distinct words in the job) however many searches are saved. Searches
+    without keywords only filter on source, job type, tag and salary.
+    """
+
+    def __init__(self, searches: Iterable[SavedSearch]):
+        self._index: Dict[str, List[IndexedSearch]] = defaultdict(list)
+        self._match_all: List[IndexedSearch] = []
+        self.size = 0
+
+        for search in searches:
+            terms = frozenset(tokenize(search.keywords))
+            entry = IndexedSearch(
+                search.id, terms, search.source or None, search.job_type or None, search.tag or None,
+                annual_salary_floor(search.min_daily, search.min_annual)
+            )
+            if terms:
+                self._index[max(terms, key=lambda term: (len(term), term))].append(entry)
+            else:
+                self._match_all.append(entry)
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def match(self, job: Job) -> List[int]:
+        """Ids of the saved searches the job matches"""
+        words = tokenize(f"{job.title} {job.company} {job.description_text or ''}")
+
+        candidates = list(self._match_all)
+        if len(self._index) < len(words):
+            candidates.extend(entry for term, entries in self._index.items() if term in words for entry in entries)
+        else:
+            for word in words:
+                candidates.extend(self._index.get(word, ()))
+
+        matched = [
+            entry for entry in candidates
+            if entry.terms <= words
+            and (entry.source is None or entry.source == job.source)
+            and (entry.job_type is None or entry.job_type == job.job_type)
+            and (entry.min_salary is None or (job.salary_annual_max or 0) >= entry.min_salary)
+        ]
+        # The job's tags are only loaded when a matching search filters on one
+        if any(entry.tag for entry in matched):
+            tags = {tag.name for tag in job.tags}
+            matched = [entry for entry in matched if entry.tag is None or entry.tag in tags]
+        return [entry.id for entry in matched]
+
+
+def load_percolator() -> Optional[Percolator]:
+    """Percolator over all saved searches, None when there are none"""
+    searches = SavedSearch.query.all()
+    return Percolator(searches) if searches else None
+
+
+def match_new_jobs(jobs: List[Job], percolator: Percolator = None) -> int:
+    """
+    Record the saved-search matches of freshly added jobs (flushing them
+    first if they have no id yet). The caller commits. Returns the number
+    of matches.
+    """
+    if percolator is None:
+        percolator = load_percolator()
+    if percolator is None or not jobs:
+        return 0
+
+    if any(job.id is None for job in jobs):
+        db.session.flush()
+
+    matched_at = datetime.utcnow()
+    matches = [
+        SavedSearchMatch(saved_search_id=search_id, job_id=job.id, matched_at=matched_at)
+        for job in jobs
+        for search_id in percolator.match(job)
+    ]
+    db.session.add_all(matches)
+    return len(matches)
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: tokens are only shared between threads
+    fcntl = None
+
+
+class TokenCache:
+    """
+    OAuth access tokens shared by every thread and worker process.
+
+    Tokens live in memory and in a JSON file. A refresh takes a thread lock
+    and an exclusive lock on `<path>.lock`, then re-reads the file: callers
+    that were waiting find the new token instead of asking for another one.
+    Tokens are refreshed `refresh_margin` seconds before they expire.
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh_margin: int = 120):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, fetch: Callable[[], Tuple[str, int]]) -> str:
+        """
+        Valid token for `key`. `fetch()` is only called when no fresh token is
+        cached anywhere; it returns (access_token, expires_in seconds).
+        """
+        token = self._fresh(self._tokens.get(key))
+        if token:
+            return token
+
+        with self._lock:
+            token = self._fresh(self._tokens.get(key))
+            if token:
+                return token
+
+            with self._file_lock():
+                entry = self._read().get(key)
+                token = self._fresh(entry)
+                if token:
+                    self._tokens[key] = entry
+                    return token
+
+                access_token, expires_in = fetch()
+                entry = {'access_token': access_token, 'expires_at': time.time() + expires_in}
+                self._tokens[key] = entry
+                self._write(key, entry)
+                return access_token
+
+    def invalidate(self, key: str):
+        """Forget a token the API rejected"""
+        with self._lock:
+            self._tokens.pop(key, None)
+            with self._file_lock():
+                tokens = self._read()
+                if tokens.pop(key, None) is not None:
+                    self._write_all(tokens)
+
+    def _fresh(self, entry: Optional[Dict]) -> Optional[str]:
+        if entry and entry.get('expires_at', 0) - self.refresh_margin > time.time():
+            return entry.get('access_token')
+        return None
+
+    @contextmanager
+    def _file_lock(self):
+        if self.path is None or fcntl is None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, key: str, entry: Dict):
+        if self.path is None:
+            return
+        tokens = self._read()
+        tokens[key] = entry
+        self._write_all(tokens)
+
+    def _write_all(self, tokens: Dict[str, Dict]):
+        if self.path is None:
+            return
+        # Written next to the target then renamed: readers never see half a file
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+        os.replace(tmp_path, self.path)
+
+
+_caches: Dict[Optional[str], TokenCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_token_cache(path: Optional[str] = None) -> TokenCache:
+    """The process-wide cache for `path` (None = memory only)"""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = TokenCache(path)
+        return cache
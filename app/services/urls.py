@@ -0,0 +1,45 @@
+import hashlib
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({
+    'trk', 'trkinfo', 'refid', 'trackingid', 'lipi', 'ebp', 'fbclid', 'gclid',
+    'msclkid', 'mc_cid', 'mc_eid', 'xtor', 'ref', 'referer', 'referrer',
+})
+TRACKING_PREFIXES = ('utm_',)
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a job URL: no scheme, lowercased host without
+    `www.` or default port, no trailing slash, fragment or tracking
+    parameters, remaining parameters sorted. None if the URL has no host.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return None
+
+    host = parts.hostname
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    query = urlencode(params)
+    return host + parts.path.rstrip('/') + (f'?{query}' if query else '')
+
+
+def url_fingerprint(url: Optional[str]) -> Optional[str]:
+    """SHA-1 of normalize_url(url): the same posting shared through different links"""
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
@@ -5,7 +5,10 @@ document.addEventListener('DOMContentLoaded', function() {
     const fetchModal = document.getElementById('fetch-modal');
     const fetchProgress = document.getElementById('fetch-progress');
 
+    let fetching = false;
+
     function fetchJobs() {
+        fetching = true;
         if (fetchModal) {
             fetchModal.style.display = 'flex';
         }
@@ -40,6 +43,7 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         })
         .catch(error => {
+            fetching = false;
             console.error('Error:', error);
             if (fetchProgress) {
                 fetchProgress.textContent = 'Error fetching jobs. Please try again.';
@@ -56,6 +60,43 @@ document.addEventListener('DOMContentLoaded', function() {
         fetchAllBtn.addEventListener('click', fetchJobs);
     }
 
+    // Live fetch progress and new job notifications (server-sent events, when
+    // SSE_ENABLED). Otherwise the fetch modal waits for /api/fetch and reloads.
+    const fetchStatus = document.getElementById('fetch-status');
+    const newJobsBanner = document.getElementById('new-jobs-banner');
+    const eventsUrl = fetchStatus && fetchStatus.dataset.eventsUrl;
+
+    if (window.EventSource && eventsUrl) {
+        const events = new EventSource(eventsUrl);
+
+        events.addEventListener('fetch_progress', function(e) {
+            const data = JSON.parse(e.data);
+            const line = `[${data.done}/${data.total}] ${data.source}: ${data.status}, ${data.count} jobs`;
+            fetchStatus.textContent = 'Fetching... ' + line;
+            if (fetching && fetchProgress) {
+                fetchProgress.textContent = line;
+            }
+        });
+
+        events.addEventListener('fetch_finished', function(e) {
+            const data = JSON.parse(e.data);
+            fetchStatus.textContent = `Last fetch: just now (${data.total_new_jobs} new)`;
+        });
+
+        events.addEventListener('jobs', function(e) {
+            // Our own fetch reloads the page when it completes
+            if (fetching || !newJobsBanner) {
+                return;
+            }
+            const data = JSON.parse(e.data);
+            const pending = (parseInt(newJobsBanner.dataset.count, 10) || 0) + data.total_new_jobs;
+            newJobsBanner.dataset.count = pending;
+            newJobsBanner.querySelector('.new-jobs-count').textContent =
+                `${pending} new job${pending === 1 ? '' : 's'}`;
+            newJobsBanner.hidden = false;
+        });
+    }
+
     if (fetchEmptyBtn) {
         fetchEmptyBtn.addEventListener('click', fetchJobs);
     }
@@ -0,0 +1,61 @@
+"""Job description text
+
+Adds the lowercased plain-text analysis column and fills it from the
+compressed descriptions (`flask descriptions normalize` recomputes it).
+
+Revision ID: 5c4118a9548a
+Revises: b54fb6046723
+Create Date: 2026-10-19 06:03:31.655012
+
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c4118a9548a'
+down_revision = 'b54fb6046723'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+job_descriptions = sa.table(
+    'job_descriptions',
+    sa.column('job_id', sa.Integer),
+    sa.column('body', sa.LargeBinary),
+    sa.column('text', sa.Text),
+)
+
+
+def upgrade():
+    from app.services.html_text import html_to_text
+
+    with op.batch_alter_table('job_descriptions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('text', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    update = job_descriptions.update() \
+        .where(job_descriptions.c.job_id == sa.bindparam('id')) \
+        .values(text=sa.bindparam('plain'))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(job_descriptions.c.job_id, job_descriptions.c.body)
+            .where(job_descriptions.c.job_id > last_id)
+            .order_by(job_descriptions.c.job_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {'id': job_id, 'plain': html_to_text(zlib.decompress(body).decode('utf-8'))}
+            for job_id, body in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('job_descriptions', schema=None) as batch_op:
+        batch_op.drop_column('text')
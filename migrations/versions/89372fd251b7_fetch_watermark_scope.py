@@ -0,0 +1,50 @@
+"""Fetch watermark scope
+
+Revision ID: 89372fd251b7
+Revises: 6968f7e9d167
+Create Date: 2026-10-19 05:48:58.397340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '89372fd251b7'
+down_revision = '6968f7e9d167'
+branch_labels = None
+depends_on = None
+
+
+def _watermarks(*key):
+    """fetch_watermarks keyed on `key`, for SQLite's batch copy: SQLite
+    reflects an unnamed primary key that could not be dropped by name"""
+    columns = [
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('posted_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+    if 'scope' in key:
+        columns.append(sa.Column('scope', sa.String(length=255), nullable=False, server_default=''))
+    return sa.Table(
+        'fetch_watermarks', sa.MetaData(), *columns,
+        sa.PrimaryKeyConstraint(*key, name='fetch_watermarks_pkey')
+    )
+
+
+def upgrade():
+    # Existing marks were all reached with the default search scope ('')
+    with op.batch_alter_table('fetch_watermarks', copy_from=_watermarks('source', 'keyword')) as batch_op:
+        batch_op.add_column(sa.Column('scope', sa.String(length=255), nullable=False, server_default=''))
+        batch_op.drop_constraint('fetch_watermarks_pkey', type_='primary')
+        batch_op.create_primary_key('fetch_watermarks_pkey', ['source', 'scope', 'keyword'])
+
+
+def downgrade():
+    # Only the default scope fits the (source, keyword) key
+    op.execute("DELETE FROM fetch_watermarks WHERE scope != ''")
+    with op.batch_alter_table('fetch_watermarks', copy_from=_watermarks('source', 'scope', 'keyword')) as batch_op:
+        batch_op.drop_constraint('fetch_watermarks_pkey', type_='primary')
+        batch_op.drop_column('scope')
+        batch_op.create_primary_key('fetch_watermarks_pkey', ['source', 'keyword'])
@@ -0,0 +1,76 @@
+"""Compressed job descriptions
+
+Moves jobs.description into job_descriptions.body, zlib-compressed, before
+dropping the column.
+
+Revision ID: b54fb6046723
+Revises: e87799401ed6
+Create Date: 2026-10-19 06:03:05.230518
+
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b54fb6046723'
+down_revision = 'e87799401ed6'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+jobs = sa.table('jobs', sa.column('id', sa.Integer), sa.column('description', sa.Text))
+job_descriptions = sa.table(
+    'job_descriptions', sa.column('job_id', sa.Integer), sa.column('body', sa.LargeBinary)
+)
+
+
+def _batches(connection, query, key):
+    """Rows of `query` BATCH_SIZE at a time, in `key` order"""
+    last = 0
+    while True:
+        rows = connection.execute(query.where(key > last).order_by(key).limit(BATCH_SIZE)).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def upgrade():
+    op.create_table('job_descriptions',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('body', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+    # Same format as app.models.compress_text; empty descriptions get no row
+    connection = op.get_bind()
+    query = sa.select(jobs.c.id, jobs.c.description).where(
+        jobs.c.description.isnot(None), jobs.c.description != ''
+    )
+    for rows in _batches(connection, query, jobs.c.id):
+        connection.execute(job_descriptions.insert(), [
+            {'job_id': job_id, 'body': zlib.compress(description.encode('utf-8'), 6)}
+            for job_id, description in rows
+        ])
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('description')
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('description', sa.TEXT(), nullable=True))
+
+    connection = op.get_bind()
+    query = sa.select(job_descriptions.c.job_id, job_descriptions.c.body)
+    for rows in _batches(connection, query, job_descriptions.c.job_id):
+        connection.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam('job_id')).values(description=sa.bindparam('text')),
+            [{'job_id': job_id, 'text': zlib.decompress(body).decode('utf-8')} for job_id, body in rows]
+        )
+
+    op.drop_table('job_descriptions')
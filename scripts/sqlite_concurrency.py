@@ -0,0 +1,140 @@
+"""
+Dashboard reads during an ingestion, on SQLite.
+
+One process stores JOBS fetched jobs with save_fetch_results (committing
+every INGEST_BATCH_SIZE jobs) while another loads the dashboard in a
+loop. Prints the read latencies per journal mode and exits with status 1
+if a read failed or took longer than --max-latency-ms with WAL.
+
+With --hold SECONDS the writer instead keeps one large write transaction
+open that long, with a small page cache so that its pages spill to the
+database file: the worst case, where DELETE-mode readers wait for the
+commit and WAL readers do not.
+
+    python scripts/sqlite_concurrency.py
+    python scripts/sqlite_concurrency.py --modes WAL --jobs 20000 --batch-size 500
+    python scripts/sqlite_concurrency.py --hold 3 --jobs 4000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _configure(database, mode, batch_size, jobs=None, hold=0):
+    os.environ.update(
+        DATABASE_URL=f'sqlite:///{database}',
+        SCHEMA_AUTO_CREATE='true',
+        SQLITE_JOURNAL_MODE=mode,
+        INGEST_BATCH_SIZE=str(batch_size),
+        PAGE_CACHE_ENABLED='false',
+    )
+    if hold:
+        os.environ['SQLITE_CACHE_SIZE'] = '-2000'  # 2 MiB
+
+
+def writer(config, ready, done, out):
+    _configure(*config)
+    from app import create_app
+    from app.services.base_fetcher import JobData
+    from app.services.ingest import save_fetch_results
+
+    jobs = [
+        JobData(
+            external_id=str(i), title=f'Python developer {i}', company=f'Company {i % 100}',
+            description='<p>Python, Django, AWS, Docker and Kubernetes.</p>' * 20,
+            url=f'https://example.com/jobs/{i}', salary_text='500-600 EUR/jour',
+            salary_min=500, salary_max=600
+        )
+        for i in range(config[3])
+    ]
+    ready.wait()  # the reader has created the schema
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        if config[4]:
+            from app import db
+            from app.services.ingest import job_from_data
+            db.session.add_all(job_from_data('remoteok', job_data) for job_data in jobs)
+            db.session.flush()
+            time.sleep(config[4])
+            db.session.commit()
+        else:
+            save_fetch_results({'remoteok': {'status': 'success', 'count': len(jobs), 'jobs': jobs}})
+        out.put(('ingest', time.perf_counter() - started))
+    done.set()
+
+
+def reader(config, ready, done, out):
+    _configure(*config)
+    from app import create_app
+
+    client = create_app().test_client()  # SCHEMA_AUTO_CREATE: creates the schema
+    client.get('/')
+    ready.set()
+
+    latencies = []
+    errors = 0
+    while not done.is_set():
+        started = time.perf_counter()
+        response = client.get('/')
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors += 1
+    out.put(('reads', sorted(latencies), errors))
+
+
+def run(mode, jobs, batch_size, hold=0):
+    """(ingest seconds, sorted read latencies, failed reads) for one journal mode"""
+    with tempfile.TemporaryDirectory() as directory:
+        config = (os.path.join(directory, 'jobs.db'), mode, batch_size, jobs, hold)
+        # Fresh interpreters: the app config is read from the environment at import
+        context = multiprocessing.get_context('spawn')
+        ready, done, out = context.Event(), context.Event(), context.Queue()
+        processes = [
+            context.Process(target=reader, args=(config, ready, done, out)),
+            context.Process(target=writer, args=(config, ready, done, out)),
+        ]
+        for process in processes:
+            process.start()
+        # A crashed worker sends nothing: give up instead of waiting forever
+        results = dict((item[0], item[1:]) for item in (out.get(timeout=600), out.get(timeout=600)))
+        for process in processes:
+            process.join()
+
+    latencies, errors = results['reads']
+    return results['ingest'][0], latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='DELETE,WAL', help='Journal modes to compare (default: DELETE,WAL)')
+    parser.add_argument('--jobs', type=int, default=6000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--hold', type=float, default=0, help='Hold one write transaction open SECONDS instead of ingesting')
+    parser.add_argument('--max-latency-ms', type=float, default=1000)
+    args = parser.parse_args()
+
+    failed = False
+    for mode in args.modes.split(','):
+        ingest, latencies, errors = run(mode.strip().upper(), args.jobs, args.batch_size, args.hold)
+        median = latencies[len(latencies) // 2] * 1000 if latencies else 0
+        worst = latencies[-1] * 1000 if latencies else 0
+        label = f'hold={args.hold:g}s' if args.hold else f'batch={args.batch_size}'
+        print(
+            f'{mode:>6} {label}: write {ingest:.1f}s, {len(latencies)} reads, '
+            f'median {median:.0f} ms, max {worst:.0f} ms, errors {errors}'
+        )
+        if errors or (mode.upper() == 'WAL' and worst > args.max_latency_ms):
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()